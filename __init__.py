@@ -7,4 +7,5 @@ automatically registers them on module installation.
 """
 
 from . import models
-from . import controllers
\ No newline at end of file
+from . import controllers
+from . import wizard
\ No newline at end of file
@@ -33,10 +33,15 @@
         'data/sequence.xml',
         'data/mail_templates.xml',
         'data/sign_templates.xml',
-        'data/automations.xml',
+        'data/cron.xml',
+        'wizard/food_booth_import_views.xml',
+        'wizard/food_partner_dedup_views.xml',
+        'wizard/food_application_import_views.xml',
         'views/menu.xml',
         'views/vendor_application_views.xml',
         'views/booth_views.xml',
+        'views/festival_kpi_views.xml',
+        'views/festival_metrics_views.xml',
         'views/event_views_inherit.xml',
         'views/portal_templates.xml',
         'views/sign_templates.xml',
@@ -5,4 +5,7 @@ controller file with Odoo's web framework.
 """
 
 from . import website
-from . import portal
\ No newline at end of file
+from . import portal
+from . import venue_map
+from . import metrics
+from . import export
\ No newline at end of file
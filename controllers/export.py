@@ -0,0 +1,49 @@
+"""
+Streaming export of the applications of an event.
+
+The file is produced while it is being sent: rows come from
+``food.vendor.application._export_rows`` in a cursor of their own,
+since the request's cursor is closed once the response is returned.
+"""
+
+from odoo import api, http, _
+from odoo.exceptions import AccessError
+from odoo.http import Response, content_disposition, request
+from odoo.modules.registry import Registry
+
+from ..models.application_transfer import EXPORT_FORMATS
+from ..models.festival_metrics import instrumented
+
+EXPORT_GROUPS = (
+    'food_truck_festival.group_food_organiser',
+    'food_truck_festival.group_food_coordinator',
+    'food_truck_festival.group_food_logistics',
+)
+
+
+class FoodFestivalExport(http.Controller):
+    @http.route('/food/export/<int:event_id>/applications.<string:file_format>', type='http', auth='user', methods=['GET'])
+    @instrumented('route.export')
+    def food_export_applications(self, event_id, file_format, **kw):
+        if file_format not in EXPORT_FORMATS:
+            return request.not_found()
+        if not any(request.env.user.has_group(group) for group in EXPORT_GROUPS):
+            raise AccessError(_('Only festival staff can export applications.'))
+        event = request.env['event.event'].browse(event_id).exists()
+        if not event:
+            return request.not_found()
+        event.check_access('read')
+        content_type, writer = EXPORT_FORMATS[file_format]
+        dbname, uid, context = request.env.cr.dbname, request.env.uid, dict(request.env.context)
+
+        def stream():
+            with Registry(dbname).cursor() as cr:
+                env = api.Environment(cr, uid, context)
+                yield from writer(env['food.vendor.application']._export_rows([('event_id', '=', event_id)]))
+
+        filename = '%s - %s.%s' % (event.name, _('Applications'), file_format)
+        return Response(stream(), headers=[
+            ('Content-Type', content_type),
+            ('Content-Disposition', content_disposition(filename)),
+            ('Cache-Control', 'no-store'),
+        ], direct_passthrough=True)
@@ -0,0 +1,34 @@
+"""
+Prometheus endpoint of the festival instrumentation.
+
+``/food/metrics`` returns the histograms collected by the instrumented
+workflow actions and routes of the worker serving the request.  It is
+readable by festival organisers, and by scrapers presenting the token
+of the ``food_truck_festival.metrics_token`` system parameter as a
+bearer token.
+"""
+
+import hmac
+
+from odoo import http
+from odoo.http import request
+
+from ..models.festival_metrics import CALL_METRICS, METRICS_TOKEN_PARAM
+
+
+class FoodFestivalMetrics(http.Controller):
+    def _metrics_allowed(self):
+        if request.env.user.has_group('food_truck_festival.group_food_organiser'):
+            return True
+        token = request.env['ir.config_parameter'].sudo().get_param(METRICS_TOKEN_PARAM)
+        authorization = request.httprequest.headers.get('Authorization', '')
+        return bool(token) and hmac.compare_digest(authorization, f'Bearer {token}')
+
+    @http.route('/food/metrics', type='http', auth='public', methods=['GET'])
+    def food_metrics(self, **kw):
+        if not self._metrics_allowed():
+            return request.make_response('', status=403)
+        return request.make_response(CALL_METRICS.render(request.env.cr.dbname), headers=[
+            ('Content-Type', 'text/plain; version=0.0.4; charset=utf-8'),
+            ('Cache-Control', 'no-store'),
+        ])
@@ -7,22 +7,157 @@ check their booth assignment.  There is also a check‑in endpoint
 consumed by QR codes at the event.
 """
 
+import hashlib
+from datetime import timezone
+
+from werkzeug.http import http_date
+
 from odoo import http, _
+from odoo.addons.portal.controllers.portal import pager as portal_pager
+from odoo.exceptions import AccessError
 from odoo.http import request
+from odoo.tools import SQL
+
+from ..models.festival_metrics import instrumented
+
+PORTAL_FOOD_PAGE_SIZE = 20
+
+SCANNER_GROUPS = (
+    'food_truck_festival.group_food_organiser',
+    'food_truck_festival.group_food_logistics',
+)
+
+
+def to_int(value, default=None):
+    """Return ``value`` as an integer, or ``default`` when it is not one."""
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return default
 
 
 class FoodFestivalPortal(http.Controller):
-    @http.route('/my/food', type='http', auth='user', website=True)
-    def portal_food_list(self, **kw):
+    def _food_list_domain(self, state=None, event_id=None):
         user_partner = request.env.user.partner_id.commercial_partner_id
-        applications = request.env['food.vendor.application'].sudo().search([
-            ('partner_id', 'child_of', user_partner.id)
-        ])
+        domain = [('partner_id', 'child_of', user_partner.id)]
+        if state:
+            domain.append(('state', '=', state))
+        if event_id:
+            domain.append(('event_id', '=', event_id))
+        return domain
+
+    def _food_list_version(self):
+        """Return the count of the user's applications and the last write
+        date of them, of their events and of their booths."""
+        Application = request.env['food.vendor.application'].sudo()
+        query = Application._search(self._food_list_domain())
+        request.env.cr.execute(SQL("""
+            SELECT COUNT(a.id), MAX(a.write_date), MAX(e.write_date), MAX(b.write_date)
+              FROM food_vendor_application a
+              JOIN event_event e ON e.id = a.event_id
+         LEFT JOIN food_booth b ON b.id = a.booth_id
+             WHERE a.id IN %s
+        """, query.subselect()))
+        count, *write_dates = request.env.cr.fetchone()
+        return count, max(filter(None, write_dates), default=None)
+
+    def _food_list_counters(self):
+        """Return application counts per state and per event in one query."""
+        Application = request.env['food.vendor.application'].sudo()
+        states = dict(Application._fields['state']._description_selection(request.env))
+        by_state, by_event = {}, {}
+        for state, event, count in Application._read_group(
+            self._food_list_domain(), ['state', 'event_id'], ['__count'],
+        ):
+            by_state[state] = by_state.get(state, 0) + count
+            entry = by_event.setdefault(event.id, {'id': event.id, 'name': event.name, 'count': 0})
+            entry['count'] += count
+        return {
+            'states': [
+                {'state': state, 'name': states.get(state, state), 'count': count}
+                for state, count in by_state.items()
+            ],
+            'events': list(by_event.values()),
+        }
+
+    def _food_list_page(self, page=1, state=None, event_id=None):
+        """Return the pager and the prefetched applications of one page."""
+        Application = request.env['food.vendor.application'].sudo()
+        domain = self._food_list_domain(state, event_id)
+        url_args = {key: value for key, value in (('state', state), ('event_id', event_id)) if value}
+        pager = portal_pager(
+            url='/my/food',
+            url_args=url_args,
+            total=Application.search_count(domain),
+            page=page,
+            step=PORTAL_FOOD_PAGE_SIZE,
+        )
+        applications = Application.search_fetch(
+            domain, ['name', 'state', 'event_id', 'booth_id'],
+            limit=PORTAL_FOOD_PAGE_SIZE, offset=pager['offset'],
+        )
+        # one query each for the displayed names of events and booths
+        applications.event_id.fetch(['name'])
+        applications.booth_id.fetch(['name'])
+        return pager, applications
+
+    @http.route(['/my/food', '/my/food/page/<int:page>'], type='http', auth='user', website=True)
+    @instrumented('route.my_food')
+    def portal_food_list(self, page=1, state=None, event_id=None, **kw):
+        page, event_id = to_int(page, 1), to_int(event_id)
+        pager, applications = self._food_list_page(page, state, event_id)
         return request.render('food_truck_festival.portal_applications', {
             'applications': applications,
+            'pager': pager,
+            'counters': self._food_list_counters(),
+            'filter_state': state,
+            'filter_event_id': event_id,
         })
 
+    @http.route('/my/food/json', type='http', auth='user', methods=['GET'])
+    @instrumented('route.my_food_json')
+    def portal_food_list_json(self, page=1, state=None, event_id=None, **kw):
+        """JSON variant of the application list supporting conditional GETs.
+
+        The validators change whenever an application of the user, or the
+        event or booth of one, is modified.
+        """
+        page, event_id = to_int(page, 1), to_int(event_id)
+        count, last_write = self._food_list_version()
+        etag = hashlib.sha1(repr((
+            request.env.user.id, count, last_write, page, state, event_id,
+        )).encode()).hexdigest()
+        headers = [
+            ('ETag', f'"{etag}"'),
+            ('Cache-Control', 'private, no-cache'),
+        ]
+        if last_write:
+            headers.append(('Last-Modified', http_date(last_write.replace(tzinfo=timezone.utc))))
+        httprequest = request.httprequest
+        if httprequest.if_none_match:
+            not_modified = httprequest.if_none_match.contains(etag)
+        else:
+            since = httprequest.if_modified_since
+            not_modified = bool(since and last_write and last_write.replace(tzinfo=timezone.utc, microsecond=0) <= since)
+        if not_modified:
+            return request.make_response('', headers=headers, status=304)
+        pager, applications = self._food_list_page(page, state, event_id)
+        return request.make_json_response({
+            'page': pager['page']['num'],
+            'page_count': pager['page_count'],
+            'total': count,
+            'counters': self._food_list_counters(),
+            'applications': [{
+                'id': app.id,
+                'name': app.name,
+                'state': app.state,
+                'event': {'id': app.event_id.id, 'name': app.event_id.name},
+                'booth': app.booth_id and {'id': app.booth_id.id, 'name': app.booth_id.name} or None,
+            } for app in applications],
+        }, headers=headers)
+
     @http.route('/my/food/<int:application_id>', type='http', auth='user', website=True)
+    @instrumented('route.my_food_detail')
     def portal_food_detail(self, application_id, **post):
         application = request.env['food.vendor.application'].sudo().browse(application_id)
         user_partner = request.env.user.partner_id.commercial_partner_id
@@ -33,13 +168,44 @@ class FoodFestivalPortal(http.Controller):
         })
 
     @http.route('/food/checkin/<string:token>', type='http', auth='public', website=True)
+    @instrumented('route.checkin')
     def food_checkin(self, token, **kw):
-        app = request.env['food.vendor.application'].sudo().search([('portal_token', '=', token)], limit=1)
-        if not app:
+        app, _checked_in = request.env['food.vendor.application'].sudo()._checkin_by_token(token)
+        if not app or app.state != 'checked_in':
             return request.render('website.404')
-        # mark check in
-        if app.state not in ('checked_in', 'closed'):
-            app.action_check_in()
         return request.render('food_truck_festival.checkin_confirmation', {
             'application': app,
-        })
\ No newline at end of file
+        })
+
+    # Offline gate scanner
+    def _get_scanner_event(self, event_id):
+        """Return the event for the gate scanner, checking the user's access."""
+        if not any(request.env.user.has_group(group) for group in SCANNER_GROUPS):
+            raise AccessError(_('Only festival logistics staff can use the gate scanner.'))
+        return request.env['event.event'].sudo().browse(event_id).exists()
+
+    @http.route('/food/scanner/<int:event_id>', type='http', auth='user', website=True)
+    @instrumented('route.scanner')
+    def food_scanner(self, event_id, **kw):
+        event = self._get_scanner_event(event_id)
+        if not event:
+            return request.render('website.404')
+        return request.render('food_truck_festival.gate_scanner', {'event': event})
+
+    @http.route('/food/scanner/<int:event_id>/manifest', type='http', auth='user', methods=['GET'])
+    @instrumented('route.scanner_manifest')
+    def food_scanner_manifest(self, event_id, **kw):
+        event = self._get_scanner_event(event_id)
+        if not event:
+            return request.not_found()
+        manifest = request.env['food.vendor.application'].sudo()._get_scanner_manifest(event)
+        return request.make_json_response(manifest, headers=[('Cache-Control', 'no-store')])
+
+    @http.route('/food/scanner/<int:event_id>/sync', type='json', auth='user', methods=['POST'])
+    @instrumented('route.scanner_sync')
+    def food_scanner_sync(self, event_id, scans=None, **kw):
+        event = self._get_scanner_event(event_id)
+        if not event:
+            return {'error': 'unknown_event'}
+        results = request.env['food.vendor.application'].sudo()._apply_scanner_checkins(event, scans or [])
+        return {'results': results}
@@ -0,0 +1,92 @@
+"""
+Controllers serving the venue map of an event to the portal.
+
+The map is delivered as pre-rendered tiles and a thumbnail, and the
+booths are exposed through a viewport endpoint returning only those
+inside the requested area as compact JSON.  All responses carry cache
+validators so that repeated views cost a 304.
+"""
+
+import hashlib
+import math
+
+from odoo import http
+from odoo.http import request
+
+from ..models.festival_metrics import instrumented
+
+MAP_MAX_AGE = 3600
+
+
+class FoodFestivalMap(http.Controller):
+    def _get_map_event(self, event_id):
+        event = request.env['event.event'].sudo().browse(event_id).exists()
+        if not event or not (event.is_published or request.env.user._is_internal()):
+            return None
+        return event
+
+    @http.route('/food/map/<int:event_id>/thumbnail', type='http', auth='user')
+    @instrumented('route.map_thumbnail')
+    def food_map_thumbnail(self, event_id, **kw):
+        event = self._get_map_event(event_id)
+        if not event or not event.map_image_512:
+            return request.not_found()
+        stream = request.env['ir.binary']._get_image_stream_from(event, 'map_image_512')
+        return stream.get_response(max_age=MAP_MAX_AGE)
+
+    @http.route('/food/map/<int:event_id>/tile/<int:zoom>/<int:tile_x>/<int:tile_y>.jpg', type='http', auth='user')
+    @instrumented('route.map_tile')
+    def food_map_tile(self, event_id, zoom, tile_x, tile_y, **kw):
+        event = self._get_map_event(event_id)
+        if not event:
+            return request.not_found()
+        tile = request.env['food.map.tile'].sudo().search([
+            ('event_id', '=', event.id),
+            ('zoom', '=', zoom),
+            ('tile_x', '=', tile_x),
+            ('tile_y', '=', tile_y),
+        ], limit=1)
+        if not tile:
+            return request.not_found()
+        stream = request.env['ir.binary']._get_stream_from(tile, 'image', mimetype='image/jpeg')
+        return stream.get_response(max_age=MAP_MAX_AGE)
+
+    @http.route('/food/map/<int:event_id>/booths', type='http', auth='user', methods=['GET'])
+    @instrumented('route.map_booths')
+    def food_map_booths(self, event_id, x0=0, y0=0, x1=100, y1=100, **kw):
+        """Return the booths inside a viewport given in map percentages."""
+        event = self._get_map_event(event_id)
+        if not event:
+            return request.not_found()
+        try:
+            x0, y0, x1, y1 = (float(value) for value in (x0, y0, x1, y1))
+        except (TypeError, ValueError):
+            x0 = y0 = x1 = y1 = math.nan
+        if not all(math.isfinite(value) for value in (x0, y0, x1, y1)):
+            return request.make_json_response({'error': 'invalid viewport'}, status=400)
+        domain = [
+            ('event_id', '=', event.id),
+            ('x_coord', '>=', min(x0, x1)), ('x_coord', '<=', max(x0, x1)),
+            ('y_coord', '>=', min(y0, y1)), ('y_coord', '<=', max(y0, y1)),
+        ]
+        Booth = request.env['food.booth'].sudo()
+        [(count, last_write)] = Booth._read_group(domain, [], ['__count', 'write_date:max'])
+        etag = hashlib.sha1(repr((event.id, x0, y0, x1, y1, count, last_write)).encode()).hexdigest()
+        headers = [('ETag', f'"{etag}"'), ('Cache-Control', 'private, no-cache')]
+        if request.httprequest.if_none_match.contains(etag):
+            return request.make_response('', headers=headers, status=304)
+        booths = Booth.search_fetch(
+            domain, ['code', 'x_coord', 'y_coord', 'width_m', 'depth_m', 'power_kw', 'water', 'sewage', 'state'],
+        )
+        return request.make_json_response({
+            'map': {
+                'width': event.map_width_px,
+                'height': event.map_height_px,
+                'max_zoom': event.map_max_zoom,
+            },
+            'fields': ['id', 'code', 'x', 'y', 'width', 'depth', 'power_kw', 'water', 'sewage', 'state'],
+            'booths': [[
+                booth.id, booth.code, booth.x_coord, booth.y_coord, booth.width_m, booth.depth_m,
+                booth.power_kw, booth.water, booth.sewage, booth.state,
+            ] for booth in booths],
+        }, headers=headers)
@@ -8,17 +8,72 @@ submission it creates an application record and sends a confirmation
 email.
 """
 
+import uuid
+
 from odoo import http, _
 from odoo.http import request
+from odoo.tools.lru import LRU
+
+from ..models.festival_metrics import instrumented
+
+# Application pages rendered for anonymous visitors, keyed by database,
+# event, language and a fingerprint of the event and its days.  The
+# values specific to a visitor are stored as placeholders.
+APPLY_FORM_CACHE = LRU(256)
+CSRF_PLACEHOLDER = '__food_csrf_token__'
+SUBMISSION_PLACEHOLDER = '__food_submission_id__'
 
 
 class FoodFestivalWebsite(http.Controller):
+    def _apply_form_fingerprint(self, event):
+        """Return a value changing whenever the event or its days change."""
+        request.env.cr.execute("""
+            SELECT e.write_date, MAX(d.write_date), COUNT(d.id)
+              FROM event_event e
+         LEFT JOIN food_event_day d ON d.event_id = e.id
+             WHERE e.id = %s
+          GROUP BY e.id
+        """, [event.id])
+        return request.env.cr.fetchone()
+
+    def _apply_form_values(self, event, submission_id):
+        days = request.env['food.event.day'].sudo().search([('event_id', '=', event.id)])
+        return {'event': event, 'days': days, 'submission_id': submission_id}
+
+    def _render_apply_form(self, event):
+        """Render the application page of ``event``.
+
+        Anonymous visitors all get the same page but for their CSRF token
+        (in the form and in the session info of the layout) and the id
+        of their submission: the page is rendered once per event and
+        language, with placeholders instead of these values, which are
+        filled in on every request.  Signed in users get a page of their
+        own.
+        """
+        if not request.env.user._is_public():
+            return request.render(
+                'food_truck_festival.application_form', self._apply_form_values(event, uuid.uuid4().hex),
+            )
+        key = (request.env.cr.dbname, event.id, request.env.lang, self._apply_form_fingerprint(event))
+        html = APPLY_FORM_CACHE.get(key)
+        if html is None:
+            html = request.render(
+                'food_truck_festival.application_form', self._apply_form_values(event, SUBMISSION_PLACEHOLDER),
+            ).render()
+            # session-wide token, rendered the same by the form and the layout
+            html = APPLY_FORM_CACHE[key] = str(html).replace(request.csrf_token(), CSRF_PLACEHOLDER)
+        html = html.replace(CSRF_PLACEHOLDER, request.csrf_token()).replace(SUBMISSION_PLACEHOLDER, uuid.uuid4().hex)
+        return request.make_response(html, headers=[
+            ('Content-Type', 'text/html; charset=utf-8'),
+            ('Cache-Control', 'private, no-store'),
+        ])
+
     @http.route('/food/apply', type='http', auth='public', website=True, sitemap=True)
+    @instrumented('route.apply')
     def food_apply(self, event_id=None, **post):
         """Display the vendor application form and handle submission."""
         Event = request.env['event.event']
         Application = request.env['food.vendor.application']
-        context = {}
         if request.httprequest.method == 'POST':
             # Handle form submission
             values = {
@@ -48,8 +103,12 @@ class FoodFestivalWebsite(http.Controller):
                     day_id = int(key.split('_')[1])
                     day_ids.append(day_id)
             values['day_ids'] = [(6, 0, day_ids)]
-            # Create application with sudo to allow website user
-            Application.sudo().create(values)
+            if event.sudo().food_rush_mode:
+                # stage the submission; the intake cron creates the application
+                request.env['food.application.intake'].sudo()._enqueue(values, post.get('submission_id'))
+            else:
+                # Create application with sudo to allow website user
+                Application.sudo().create(values)
             return request.render('food_truck_festival.application_thankyou', {'event': event})
         # Display form
         # Determine event
@@ -59,10 +118,4 @@ class FoodFestivalWebsite(http.Controller):
             event = Event.sudo().search([('is_published', '=', True)], order='date_begin desc', limit=1)
         if not event:
             return request.render('website.404')
-        # Get event days
-        days = request.env['food.event.day'].sudo().search([('event_id', '=', event.id)])
-        context.update({
-            'event': event,
-            'days': days,
-        })
-        return request.render('food_truck_festival.application_form', context)
\ No newline at end of file
+        return self._render_apply_form(event)
\ No newline at end of file
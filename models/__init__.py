@@ -11,4 +11,13 @@ from . import event
 from . import booth
 from . import service_line
 from . import vendor_application
-from . import event_day
\ No newline at end of file
+from . import event_day
+from . import event_package
+from . import application_intake
+from . import map_tile
+from . import report_badge
+from . import sign_request
+from . import festival_kpi
+from . import festival_metrics
+from . import res_partner
+from . import application_transfer
\ No newline at end of file
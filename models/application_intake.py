@@ -0,0 +1,147 @@
+"""
+Staging table for website applications received in rush mode.
+
+When an event is in rush mode the website form only stores the raw
+submission here and returns immediately.  A scheduled job then turns
+pending submissions into vendor applications in batches: numbers are
+drawn from the sequence in blocks, repeated submissions of one form are
+discarded and the confirmation emails are queued in one go.
+
+A submission is identified by the id generated for the form it was
+posted from, or by a hash of its whole content, so that a double click
+or a resent form is only processed once, while the several trucks of a
+caterer are all accepted.  Submissions failing to materialize are
+retried by the next runs.
+"""
+
+import hashlib
+import json
+import logging
+import threading
+
+from odoo import api, fields, models, _
+from odoo.tools import split_every
+
+from .vendor_application import DIGEST_THRESHOLD, QUIET_CONTEXT
+
+_logger = logging.getLogger(__name__)
+
+# Runs of the intake cron a failing submission is tried in
+INTAKE_MAX_ATTEMPTS = 3
+
+
+class FoodApplicationIntake(models.Model):
+    _name = 'food.application.intake'
+    _description = 'Food Festival Application Intake'
+    _order = 'id'
+    _log_access = False
+
+    event_id = fields.Many2one('event.event', required=True, ondelete='cascade')
+    payload = fields.Json(required=True)
+    dedup_key = fields.Char(index=True)
+    state = fields.Selection([
+        ('pending', 'Pending'),
+        ('done', 'Done'),
+        ('duplicate', 'Duplicate'),
+        ('error', 'Error'),
+    ], default='pending', required=True, index=True)
+    error = fields.Char()
+    attempts = fields.Integer(default=0)
+    application_id = fields.Many2one('food.vendor.application', ondelete='set null')
+    create_date = fields.Datetime(default=fields.Datetime.now, readonly=True)
+
+    @api.model
+    def _dedup_key(self, values, submission_id=None):
+        """Return the key identifying repeated posts of one submission.
+
+        :param submission_id: id generated for the form the submission
+            was posted from; the content of the submission is hashed when
+            there is none
+        """
+        identity = submission_id or hashlib.sha256(
+            json.dumps(values, sort_keys=True, default=str).encode()
+        ).hexdigest()
+        return f"{values['event_id']}:{identity}"
+
+    @api.model
+    def _enqueue(self, values, submission_id=None):
+        """Stage a website submission for batch processing."""
+        return self.create({
+            'event_id': values['event_id'],
+            'payload': values,
+            'dedup_key': self._dedup_key(values, submission_id),
+        })
+
+    def _materialize(self):
+        """Create the applications of the pending submissions in ``self``."""
+        Application = self.env['food.vendor.application']
+        pending = self.filtered(lambda i: i.state in ('pending', 'error'))
+        keys = {key for key in pending.mapped('dedup_key') if key}
+        # submissions already turned into an application
+        taken = set()
+        if keys:
+            done = self.search_fetch([('dedup_key', 'in', list(keys)), ('state', '=', 'done')], ['dedup_key'])
+            taken = set(done.mapped('dedup_key'))
+        to_create, duplicates = self.browse(), self.browse()
+        for intake in pending:
+            if intake.dedup_key and intake.dedup_key in taken:
+                duplicates |= intake
+                continue
+            if intake.dedup_key:
+                taken.add(intake.dedup_key)
+            to_create |= intake
+        duplicates.state = 'duplicate'
+        if not to_create:
+            return Application
+        numbers = Application._reserve_application_numbers(len(to_create))
+        quiet = len(to_create) >= DIGEST_THRESHOLD
+        applications = Application.with_context(**(QUIET_CONTEXT if quiet else {})).create([
+            dict(intake.payload, name=number)
+            for intake, number in zip(to_create, numbers)
+        ])
+        for intake, application in zip(to_create, applications):
+            intake.application_id = application
+        to_create.write({'state': 'done', 'error': False})
+        if quiet:
+            applications._post_digest(_('Applications received from the website.'))
+        template = self.env.ref('food_truck_festival.email_template_vendor_application_received', raise_if_not_found=False)
+        if template:
+            applications._send_vendor_notifications(template)
+        return applications
+
+    @api.model
+    def _cron_process_intake(self, batch_size=500):
+        """Materialize pending submissions in committed batches.
+
+        A batch failing as a whole is processed again one submission at a
+        time, each in a savepoint, so that only the failing submissions
+        are flagged; they are retried by the next runs until
+        ``INTAKE_MAX_ATTEMPTS`` is reached.
+        """
+        intakes = self.search([
+            '|', ('state', '=', 'pending'),
+            '&', ('state', '=', 'error'), ('attempts', '<', INTAKE_MAX_ATTEMPTS),
+        ])
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        done, remaining = 0, len(intakes)
+        for batch_ids in split_every(batch_size, intakes.ids):
+            batch = self.browse(batch_ids)
+            try:
+                with self.env.cr.savepoint():
+                    batch._materialize()
+            except Exception:
+                _logger.warning('Processing of application intake %s failed, retrying one by one', batch_ids)
+                for intake in batch:
+                    try:
+                        with self.env.cr.savepoint():
+                            intake._materialize()
+                    except Exception as e:
+                        _logger.warning('Processing of application intake %s failed: %s', intake.id, e)
+                        intake.write({'state': 'error', 'error': str(e), 'attempts': intake.attempts + 1})
+            if auto_commit:
+                self.env.cr.commit()
+            done += len(batch_ids)
+            remaining -= len(batch_ids)
+            self.env['ir.cron']._notify_progress(done=done, remaining=remaining)
+            self.env.invalidate_all()
+
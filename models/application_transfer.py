@@ -0,0 +1,273 @@
+"""
+Bulk export and import of vendor applications with their service lines.
+
+The export walks the applications of an event in id order, one chunk
+at a time, and yields spreadsheet rows from a generator: the record
+cache is emptied after every chunk, so memory stays constant whatever
+the size of the event.  Rows are then serialized to CSV or XLSX by the
+writers below while the HTTP response is being streamed.
+
+The file layout follows the usual one2many convention: the first row of
+an application carries its columns and its first service line, the
+following rows only the columns of its other service lines.  The same
+layout is read back by the importer, which creates applications, lines
+and day links with multi-record operations.
+"""
+
+import csv
+import datetime
+import io
+import re
+import tempfile
+
+from odoo import _, api, models
+from odoo.exceptions import UserError
+from odoo.tools import split_every
+
+from .vendor_application import PRICING_PACKAGES, QUIET_CONTEXT
+
+APPLICATION_COLUMNS = (
+    'name', 'state', 'company', 'vat', 'email', 'phone', 'event', 'booth', 'days',
+    'pricing_package', 'needs_power_kw', 'needs_water', 'needs_sewage', 'truck_width', 'truck_depth',
+    'subtotal', 'taxes', 'total',
+)
+LINE_COLUMNS = ('service', 'qty', 'price_unit')
+EXPORT_COLUMNS = APPLICATION_COLUMNS + LINE_COLUMNS
+
+# Columns of the file identifying the vendor; a row filling none of them
+# adds a service line to the application of the previous row.
+VENDOR_COLUMNS = ('company', 'vat', 'email', 'phone')
+FLOAT_COLUMNS = ('needs_power_kw', 'truck_width', 'truck_depth')
+BOOLEAN_COLUMNS = ('needs_water', 'needs_sewage')
+# States an imported application may start in: later states stand for a
+# booth allocation, a contract or an invoice that an import cannot create.
+IMPORT_STATES = ('new', 'review')
+
+# Applications read per chunk by the export, and created per ``create``
+# by the import.
+EXPORT_CHUNK_SIZE = 1000
+IMPORT_CHUNK_SIZE = 1000
+# Size in bytes of the chunks of the streamed files
+STREAM_BUFFER_SIZE = 64 * 1024
+
+
+def parse_bool(value):
+    return str(value).strip().lower() in ('1', 'true', 'yes', 'y', 'x')
+
+
+def csv_stream(rows):
+    """Serialize ``rows`` to CSV, yielding encoded chunks of the file."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for row in rows:
+        writer.writerow(row)
+        if buffer.tell() >= STREAM_BUFFER_SIZE:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue().encode()
+
+
+def xlsx_stream(rows):
+    """Serialize ``rows`` to XLSX, yielding chunks of the file.
+
+    The workbook is written in constant memory mode, row by row, to a
+    temporary file which is then streamed.
+    """
+    import xlsxwriter
+
+    with tempfile.TemporaryFile() as output:
+        workbook = xlsxwriter.Workbook(output, {'constant_memory': True, 'tmpdir': tempfile.gettempdir()})
+        worksheet = workbook.add_worksheet('Applications')
+        bold = workbook.add_format({'bold': True})
+        for index, row in enumerate(rows):
+            worksheet.write_row(index, 0, row, bold if index == 0 else None)
+        workbook.close()
+        output.seek(0)
+        while chunk := output.read(STREAM_BUFFER_SIZE):
+            yield chunk
+
+
+EXPORT_FORMATS = {
+    'csv': ('text/csv; charset=utf-8', csv_stream),
+    'xlsx': ('application/vnd.openxmlformats-officedocument.spreadsheetml.sheet', xlsx_stream),
+}
+
+
+def read_rows(content, file_format):
+    """Yield the rows of a CSV or XLSX file as dicts keyed by the header."""
+    if file_format == 'csv':
+        if isinstance(content, bytes):
+            content = content.decode('utf-8-sig')
+        yield from csv.DictReader(io.StringIO(content))
+        return
+    if file_format != 'xlsx':
+        raise UserError(_('Unsupported application file format: %s', file_format))
+    import openpyxl
+
+    workbook = openpyxl.load_workbook(io.BytesIO(content), read_only=True, data_only=True)
+    try:
+        cells = workbook.active.iter_rows(values_only=True)
+        header = [str(value or '').strip() for value in next(cells, ())]
+        for values in cells:
+            yield {
+                column: value.date().isoformat() if isinstance(value, datetime.datetime) else
+                ('' if value is None else str(value))
+                for column, value in zip(header, values)
+            }
+    finally:
+        workbook.close()
+
+
+class FoodVendorApplication(models.Model):
+    _inherit = 'food.vendor.application'
+
+    @api.model
+    def _export_rows(self, domain):
+        """Yield the header and the rows of the applications matching ``domain``.
+
+        Applications are read by chunks of ``EXPORT_CHUNK_SIZE`` with
+        keyset pagination on the id; the related partners, booths, days
+        and service lines of a chunk are fetched with one query each.
+        """
+        yield list(EXPORT_COLUMNS)
+        blank = [''] * len(APPLICATION_COLUMNS)
+        last_id = 0
+        while True:
+            apps = self.search_fetch(domain + [('id', '>', last_id)], [
+                'name', 'state', 'company_name_fallback', 'vat_fallback', 'email_fallback', 'phone_fallback',
+                'partner_id', 'event_id', 'booth_id', 'day_ids', 'pricing_package', 'needs_power_kw',
+                'needs_water', 'needs_sewage', 'truck_width', 'truck_depth',
+                'computed_subtotal', 'taxes', 'computed_total', 'service_line_ids',
+            ], order='id', limit=EXPORT_CHUNK_SIZE)
+            if not apps:
+                return
+            apps.partner_id.fetch(['name', 'vat', 'email', 'phone'])
+            apps.event_id.fetch(['name'])
+            apps.booth_id.fetch(['code'])
+            apps.day_ids.fetch(['date'])
+            apps.service_line_ids.fetch(['product_id', 'qty', 'price_unit'])
+            apps.service_line_ids.product_id.fetch(['default_code', 'name'])
+            for app in apps:
+                partner = app.partner_id
+                row = [
+                    app.name, app.state,
+                    partner.name or app.company_name_fallback or '',
+                    partner.vat or app.vat_fallback or '',
+                    partner.email or app.email_fallback or '',
+                    partner.phone or app.phone_fallback or '',
+                    app.event_id.name, app.booth_id.code or '',
+                    ' '.join(sorted(day.date.isoformat() for day in app.day_ids)),
+                    app.pricing_package or '', app.needs_power_kw,
+                    app.needs_water, app.needs_sewage, app.truck_width, app.truck_depth,
+                    app.computed_subtotal, app.taxes, app.computed_total,
+                ]
+                if not app.service_line_ids:
+                    yield row + [''] * len(LINE_COLUMNS)
+                for index, line in enumerate(app.service_line_ids):
+                    product = line.product_id
+                    yield (row if index == 0 else blank) + [
+                        product.default_code or product.name, line.qty, line.price_unit,
+                    ]
+            last_id = apps[-1].id
+            # drop the chunk from the cache to keep the memory constant
+            self.env.invalidate_all()
+
+    @api.model
+    def _import_applications(self, event, content, file_format='csv'):
+        """Create the applications of a vendor list in ``event``.
+
+        The file is validated in a single pass and every problem is
+        reported at once; nothing is created unless the whole file is
+        valid.  Applications are then created by chunks with one
+        multi-record ``create`` each, service lines and day links
+        included, and matched to existing partners in bulk (see
+        :meth:`_ensure_partners`).
+
+        Imported applications always get fresh numbers from the sequence:
+        the ``name`` column is ignored, so that re-importing an export
+        never duplicates a number.  Only the ``new`` and ``review`` states
+        are accepted.  The ``booth``, ``subtotal``, ``taxes`` and ``total``
+        columns are intentionally not imported either: booths go through
+        the allocator and amounts are computed from the package and the
+        service lines.
+
+        :return: the created ``food.vendor.application`` records
+        """
+        rows = list(read_rows(content, file_format))
+        days = {day.date.isoformat(): day.id for day in event.food_event_day_ids}
+        packages = dict(PRICING_PACKAGES)
+        refs = {(row.get('service') or '').strip() for row in rows} - {''}
+        products = self.env['product.product'].search_fetch(
+            ['|', ('default_code', 'in', list(refs)), ('name', 'in', list(refs))],
+            ['default_code', 'name'],
+        ) if refs else self.env['product.product']
+        # internal references win over names
+        product_ids = {product.name: product.id for product in products}
+        product_ids.update({product.default_code: product.id for product in products if product.default_code})
+        errors, vals_list = [], []
+        for index, row in enumerate(rows, start=2):
+            row = {column: (value or '').strip() for column, value in row.items() if column}
+            if any(row.get(column) for column in VENDOR_COLUMNS):
+                vals = {
+                    'event_id': event.id,
+                    'company_name_fallback': row.get('company') or False,
+                    'vat_fallback': row.get('vat') or False,
+                    'email_fallback': row.get('email') or False,
+                    'phone_fallback': row.get('phone') or False,
+                    'service_line_ids': [],
+                }
+                if row.get('state'):
+                    if row['state'] not in IMPORT_STATES:
+                        errors.append(_(
+                            'Row %(row)s: applications can only be imported as new or in review, not %(value)r.',
+                            row=index, value=row['state'],
+                        ))
+                    vals['state'] = row['state']
+                if row.get('pricing_package'):
+                    if row['pricing_package'] not in packages:
+                        errors.append(_('Row %(row)s: unknown pricing package %(value)r.', row=index, value=row['pricing_package']))
+                    vals['pricing_package'] = row['pricing_package']
+                for fname in FLOAT_COLUMNS:
+                    if row.get(fname):
+                        try:
+                            vals[fname] = float(row[fname])
+                        except ValueError:
+                            errors.append(_('Row %(row)s: invalid value %(value)r for %(field)s.', row=index, value=row[fname], field=fname))
+                for fname in BOOLEAN_COLUMNS:
+                    if row.get(fname):
+                        vals[fname] = parse_bool(row[fname])
+                day_ids = []
+                for date in re.split(r'[\s,;|]+', row.get('days', '')):
+                    if date and date not in days:
+                        errors.append(_('Row %(row)s: %(date)s is not a day of the event.', row=index, date=date))
+                    elif date:
+                        day_ids.append(days[date])
+                vals['day_ids'] = [(6, 0, day_ids)]
+                vals_list.append(vals)
+            elif not vals_list:
+                errors.append(_('Row %s: service line without an application.', index))
+                continue
+            if not row.get('service'):
+                continue
+            line = {'product_id': product_ids.get(row['service'])}
+            if not line['product_id']:
+                errors.append(_('Row %(row)s: unknown service %(service)s.', row=index, service=row['service']))
+            try:
+                line['qty'] = float(row.get('qty') or 1.0)
+                if row.get('price_unit'):
+                    line['price_unit'] = float(row['price_unit'])
+            except ValueError:
+                errors.append(_('Row %s: invalid quantity or unit price.', index))
+            vals_list[-1]['service_line_ids'].append((0, 0, line))
+        if errors:
+            raise UserError('\n'.join(errors[:50]))
+        for vals, number in zip(vals_list, self._reserve_application_numbers(len(vals_list))):
+            vals['name'] = number
+        Application = self.with_context(**QUIET_CONTEXT)
+        applications = self.browse()
+        for chunk in split_every(IMPORT_CHUNK_SIZE, vals_list, list):
+            apps = Application.create(chunk)
+            apps._ensure_partners()
+            applications |= apps
+        return applications.with_env(self.env)
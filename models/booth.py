@@ -4,8 +4,104 @@ events.  Each booth belongs to an event and can be reserved by
 applications.  Coordinates allow the booth to be placed on a map.
 """
 
-from odoo import api, fields, models
+import heapq
+import math
+
+from psycopg2 import errors
+
+from odoo import api, fields, models, tools
 from odoo.tools import float_round
+from odoo.tools.sql import create_index
+
+# Edge length, in map units, of the cells of the booth spatial index.
+SPATIAL_CELL_SIZE = 5.0
+
+# Booth fields whose change invalidates the spatial index of the event.
+SPATIAL_FIELDS = ('event_id', 'x_coord', 'y_coord', 'power_kw')
+
+
+class BoothGrid:
+    """Uniform grid over the booths of one event.
+
+    Positions are stored in map units: metres when the event defines the
+    real width of its map, map percentages otherwise.  Each cell keeps
+    the ``(booth_id, x, y, power_kw)`` entries falling inside it, so that
+    radius, nearest-neighbour and zone queries only visit the cells
+    around the query instead of every booth of the event.
+    """
+
+    def __init__(self, entries, cell_size=SPATIAL_CELL_SIZE):
+        self.cell_size = cell_size
+        self.cells = {}
+        self.positions = {}
+        for entry in entries:
+            self.positions[entry[0]] = entry
+            self.cells.setdefault(self._cell(entry[1], entry[2]), []).append(entry)
+
+    def _cell(self, x, y):
+        return (int(x // self.cell_size), int(y // self.cell_size))
+
+    def _scan(self, x0, y0, x1, y1):
+        cx0, cy0 = self._cell(x0, y0)
+        cx1, cy1 = self._cell(x1, y1)
+        for cx in range(cx0, cx1 + 1):
+            for cy in range(cy0, cy1 + 1):
+                yield from self.cells.get((cx, cy), ())
+
+    def within(self, x, y, radius):
+        """Return ``(distance, entry)`` pairs of booths within ``radius``."""
+        result = []
+        for entry in self._scan(x - radius, y - radius, x + radius, y + radius):
+            distance = math.hypot(entry[1] - x, entry[2] - y)
+            if distance <= radius:
+                result.append((distance, entry))
+        result.sort()
+        return result
+
+    def nearest(self, x, y, count=1, exclude=()):
+        """Return the ``count`` nearest ``(distance, entry)`` pairs.
+
+        Rings of cells are visited outwards until enough booths are found
+        closer than any booth an unvisited ring could contain.
+        """
+        if not self.cells:
+            return []
+        cx, cy = self._cell(x, y)
+        max_ring = max(
+            max(abs(key[0] - cx), abs(key[1] - cy)) for key in self.cells
+        )
+        found = []
+        for ring in range(max_ring + 1):
+            for key in self._ring(cx, cy, ring):
+                for entry in self.cells.get(key, ()):
+                    if entry[0] not in exclude:
+                        found.append((math.hypot(entry[1] - x, entry[2] - y), entry))
+            best = heapq.nsmallest(count, found)
+            # every booth beyond this ring is at least ``ring`` cells away
+            if len(best) == count and best[-1][0] <= ring * self.cell_size:
+                return best
+        return heapq.nsmallest(count, found)
+
+    @staticmethod
+    def _ring(cx, cy, ring):
+        if ring == 0:
+            yield (cx, cy)
+            return
+        for dx in range(-ring, ring + 1):
+            yield (cx + dx, cy - ring)
+            yield (cx + dx, cy + ring)
+        for dy in range(-ring + 1, ring):
+            yield (cx - ring, cy + dy)
+            yield (cx + ring, cy + dy)
+
+    def zone(self, x0, y0, x1, y1):
+        """Return the entries of the booths inside a rectangle."""
+        x0, x1 = min(x0, x1), max(x0, x1)
+        y0, y1 = min(y0, y1), max(y0, y1)
+        return [
+            entry for entry in self._scan(x0, y0, x1, y1)
+            if x0 <= entry[1] <= x1 and y0 <= entry[2] <= y1
+        ]
 
 
 class FoodBooth(models.Model):
@@ -39,8 +135,20 @@ class FoodBooth(models.Model):
         ('available', 'Available'),
         ('reserved', 'Reserved'),
         ('occupied', 'Occupied'),
-    ], default='available', string='State')
+    ], default='available', string='State', compute='_compute_occupancy', store=True, readonly=False,
+        help='Available while at least one event day is free; reserved once every day is booked.')
     application_id = fields.Many2one('food.vendor.application', string='Vendor Application')
+    # archived applications still hold their days on the booth
+    reservation_ids = fields.One2many(
+        'food.vendor.application', 'booth_id', string='Reservations', context={'active_test': False},
+    )
+    occupancy_mask = fields.Integer(
+        string='Occupancy',
+        compute='_compute_occupancy',
+        store=True,
+        help='Technical field: bit i is set when event day i is booked by an application.',
+    )
+    active = fields.Boolean(default=True, help='Booths of archived festival seasons are hidden.')
 
     _sql_constraints = [
         (
@@ -50,11 +158,63 @@ class FoodBooth(models.Model):
         ),
     ]
 
+    def init(self):
+        super().init()
+        # candidate booths of the allocator and of the atomic booth claim,
+        # searched by event and bisected on power; archived seasons are
+        # left out, as by the default ``active_test`` search
+        create_index(
+            self.env.cr, 'food_booth_available_idx', self._table, ['event_id', 'power_kw'],
+            where="state = 'available' AND active",
+        )
+
     @api.depends('width_m', 'depth_m')
     def _compute_area(self):
         for booth in self:
             booth.area_sqm = float_round((booth.width_m or 0.0) * (booth.depth_m or 0.0), precision_digits=2)
 
+    @api.depends('reservation_ids.day_mask', 'reservation_ids.state', 'event_id.food_day_mask')
+    def _compute_occupancy(self):
+        for booth in self:
+            mask = 0
+            for app in booth.reservation_ids:
+                if app.state != 'rejected':
+                    mask |= app.day_mask
+            booth.occupancy_mask = mask
+            if booth.state != 'occupied':
+                full = booth.event_id.food_day_mask
+                booth.state = 'reserved' if mask and mask & full == full else 'available'
+
+    def is_free_on(self, day_mask):
+        """Return whether none of the days of ``day_mask`` is booked."""
+        self.ensure_one()
+        return self.state != 'occupied' and not self.occupancy_mask & day_mask
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        booths = super().create(vals_list)
+        booths.event_id._bump_food_spatial_version()
+        self.env['food.festival.kpi']._mark_events_dirty(booths.event_id.ids)
+        return booths
+
+    def write(self, vals):
+        spatial = any(fname in vals for fname in SPATIAL_FIELDS)
+        # the previous event too, when booths are moved
+        events = self.event_id if spatial else self.env['event.event']
+        res = super().write(vals)
+        if 'state' in vals or 'event_id' in vals:
+            self.env['food.festival.kpi']._mark_events_dirty(self.event_id.ids)
+        if spatial:
+            (events | self.event_id)._bump_food_spatial_version()
+        return res
+
+    def unlink(self):
+        events = self.event_id
+        self.env['food.festival.kpi']._mark_events_dirty(events.ids)
+        res = super().unlink()
+        events._bump_food_spatial_version()
+        return res
+
     def name_get(self):
         """Override to include event name when displaying booth names."""
         result = []
@@ -65,7 +225,206 @@ class FoodBooth(models.Model):
             result.append((booth.id, display))
         return result
 
+    @api.model
+    def _lock_booths(self, booth_ids):
+        """Row-lock the booths of ``booth_ids`` that are still available.
+
+        Rows already locked by another transaction are skipped rather
+        than waited for (``SKIP LOCKED``), so parallel approvers never
+        wait on each other.  Under REPEATABLE READ a row updated by a
+        transaction committed after our snapshot cannot be locked at all:
+        when the batch lock fails on such a row, booths are locked one by
+        one in savepoints and those rows are skipped as well.
+
+        :return: set of the ids of the locked booths
+        """
+        if not booth_ids:
+            return set()
+        self.flush_model(['state', 'active'])
+        query = """
+            SELECT id
+              FROM food_booth
+             WHERE id IN %s AND state = 'available' AND active
+             ORDER BY id
+               FOR UPDATE SKIP LOCKED
+        """
+        try:
+            with self.env.cr.savepoint():
+                self.env.cr.execute(query, [tuple(booth_ids)], log_exceptions=False)
+                return {row[0] for row in self.env.cr.fetchall()}
+        except errors.SerializationFailure:
+            pass
+        locked = set()
+        for booth_id in sorted(booth_ids):
+            try:
+                with self.env.cr.savepoint():
+                    self.env.cr.execute(query, [(booth_id,)], log_exceptions=False)
+                    locked.update(row[0] for row in self.env.cr.fetchall())
+            except errors.SerializationFailure:
+                continue
+        return locked
+
+    @api.model
+    def _claim_booth(self, application):
+        """Atomically reserve the best matching available booth.
+
+        The booth is selected and reserved by a single statement; rows
+        locked by concurrent transactions are skipped so that parallel
+        approvals never wait on each other nor pick the same booth.
+        Booths already booked on other days than the application's are
+        shared: only the requested days must be free.
+        Booths lacking a requested utility, power or floor space (the
+        truck may be rotated) are excluded.  Partly booked booths are
+        filled first, then the least equipped matching booth is preferred.
+        Raises ``SerializationFailure`` when the selected booth was updated
+        by a transaction committed after ours started; callers run it in
+        a savepoint.
+
+        :return: the reserved ``food.booth`` record, or an empty recordset
+        """
+        application.ensure_one()
+        self.flush_model()
+        application.flush_recordset()
+        width = application.truck_width or 0.0
+        depth = application.truck_depth or 0.0
+        self.env.cr.execute("""
+            UPDATE food_booth
+               SET occupancy_mask = COALESCE(occupancy_mask, 0) | %(mask)s,
+                   state = CASE WHEN (COALESCE(occupancy_mask, 0) | %(mask)s) & %(full)s = %(full)s
+                                THEN 'reserved' ELSE state END,
+                   application_id = COALESCE(application_id, %(app)s),
+                   write_uid = %(uid)s, write_date = (now() at time zone 'UTC')
+             WHERE id = (
+                    SELECT id
+                      FROM food_booth
+                     WHERE event_id = %(event)s
+                       AND state = 'available'
+                       AND active
+                       AND (COALESCE(occupancy_mask, 0) & %(mask)s) = 0
+                       AND (water OR NOT %(water)s)
+                       AND (sewage OR NOT %(sewage)s)
+                       AND COALESCE(power_kw, 0) >= %(power)s
+                       AND ((COALESCE(width_m, 0) >= %(width)s AND COALESCE(depth_m, 0) >= %(depth)s)
+                         OR (COALESCE(width_m, 0) >= %(depth)s AND COALESCE(depth_m, 0) >= %(width)s))
+                     ORDER BY COALESCE(occupancy_mask, 0) = 0,
+                              COALESCE(water, false)::int + COALESCE(sewage, false)::int,
+                              power_kw, width_m * depth_m, id
+                     LIMIT 1
+                       FOR UPDATE SKIP LOCKED
+                   )
+         RETURNING id
+        """, {
+            'app': application.id,
+            'mask': application.day_mask,
+            'full': application.event_id.food_day_mask,
+            'uid': self.env.uid,
+            'event': application.event_id.id,
+            'water': bool(application.needs_water),
+            'sewage': bool(application.needs_sewage),
+            'power': application.needs_power_kw or 0.0,
+            'width': width,
+            'depth': depth,
+        })
+        row = self.env.cr.fetchone()
+        if not row:
+            return self.browse()
+        booth = self.browse(row[0])
+        booth.invalidate_recordset(['state', 'occupancy_mask', 'application_id', 'write_uid', 'write_date'])
+        # the application side is written through the ORM so that totals
+        # and other dependencies are recomputed as usual
+        application.booth_id = booth
+        return booth
+
+    # Spatial queries
+    def _get_spatial_index(self, event_id):
+        """Return the :class:`BoothGrid` of an event, built once per process.
+
+        The cache key includes the spatial version of the event, which is
+        incremented on commit of the transactions creating, deleting or
+        moving its booths, changing their power rating or changing its
+        map; other events and other caches of the registry are left
+        untouched.  A transaction with such pending changes builds the
+        index of the event from its own data, without caching it.
+        """
+        if event_id in self.env.cr.precommit.data.get('food_spatial.events', ()):
+            return self._build_spatial_grid(event_id)
+        version = self.env['event.event'].browse(event_id).food_spatial_version
+        return self._get_spatial_grid(event_id, version)
+
+    @tools.ormcache('event_id', 'version')
+    def _get_spatial_grid(self, event_id, version):
+        return self._build_spatial_grid(event_id)
+
+    def _build_spatial_grid(self, event_id):
+        event = self.env['event.event'].browse(event_id)
+        scale_x, scale_y = event._get_map_scale()
+        self.flush_model(list(SPATIAL_FIELDS))
+        self.env.cr.execute("""
+            SELECT id, COALESCE(x_coord, 0), COALESCE(y_coord, 0), COALESCE(power_kw, 0)
+              FROM food_booth
+             WHERE event_id = %s
+        """, [event_id])
+        return BoothGrid(
+            (booth_id, x * scale_x, y * scale_y, power)
+            for booth_id, x, y, power in self.env.cr.fetchall()
+        )
+
+    def _spatial_position(self):
+        """Return the position of the booth in the map units of its event."""
+        self.ensure_one()
+        scale_x, scale_y = self.event_id._get_map_scale()
+        return (self.x_coord or 0.0) * scale_x, (self.y_coord or 0.0) * scale_y
+
+    @api.model
+    def search_nearest(self, event, x, y, count=1):
+        """Return the ``count`` booths of ``event`` nearest to a map point.
+
+        ``x`` and ``y`` are map percentages, like the booth coordinates.
+        """
+        scale_x, scale_y = event._get_map_scale()
+        grid = self._get_spatial_index(event.id)
+        pairs = grid.nearest(x * scale_x, y * scale_y, count)
+        return self.browse(entry[0] for _distance, entry in pairs)
+
+    @api.model
+    def search_within(self, event, x, y, radius):
+        """Return the booths of ``event`` within ``radius`` of a map point.
+
+        ``radius`` is in metres when the event defines its map width,
+        in map percentages otherwise.  Booths are sorted by distance.
+        """
+        scale_x, scale_y = event._get_map_scale()
+        grid = self._get_spatial_index(event.id)
+        pairs = grid.within(x * scale_x, y * scale_y, radius)
+        return self.browse(entry[0] for _distance, entry in pairs)
+
+    def get_neighbours(self, radius):
+        """Return the other booths of the event within ``radius`` of this one."""
+        self.ensure_one()
+        grid = self._get_spatial_index(self.event_id.id)
+        x, y = self._spatial_position()
+        return self.browse(
+            entry[0] for _distance, entry in grid.within(x, y, radius) if entry[0] != self.id
+        )
+
+    @api.model
+    def get_zone_summary(self, event, x0, y0, x1, y1):
+        """Aggregate the booths of ``event`` inside a rectangle of the map.
+
+        :return: dict with the ``booth_ids``, their ``count`` and their
+            total ``power_kw``
+        """
+        scale_x, scale_y = event._get_map_scale()
+        grid = self._get_spatial_index(event.id)
+        entries = grid.zone(x0 * scale_x, y0 * scale_y, x1 * scale_x, y1 * scale_y)
+        return {
+            'booth_ids': [entry[0] for entry in entries],
+            'count': len(entries),
+            'power_kw': sum(entry[3] for entry in entries),
+        }
+
     def action_reset(self):
         """Reset booth to available state and clear assignment."""
+        self.reservation_ids.booth_id = False
         for booth in self:
             booth.write({'state': 'available', 'application_id': False})
\ No newline at end of file
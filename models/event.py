@@ -9,7 +9,40 @@ allocation per booth.  These fields are used when assigning
 booths and preparing documentation for vendors.
 """
 
-from odoo import fields, models
+import base64
+import csv
+import io
+import json
+import math
+from datetime import timedelta
+
+import pytz
+from PIL import Image
+
+from odoo import _, api, fields, models
+from odoo.exceptions import UserError
+from odoo.tools import split_every
+
+# Edge length in pixels of the map tiles served to the portal.
+MAP_TILE_SIZE = 256
+
+# Columns accepted by the booth layout import, with their converters.
+BOOTH_IMPORT_FIELDS = {
+    'code': str,
+    'name': str,
+    'width_m': float,
+    'depth_m': float,
+    'power_kw': float,
+    'water': lambda value: str(value).strip().lower() in ('1', 'true', 'yes', 'y', 'x'),
+    'sewage': lambda value: str(value).strip().lower() in ('1', 'true', 'yes', 'y', 'x'),
+    'price_per_day': float,
+    'x_coord': float,
+    'y_coord': float,
+}
+
+# Days after their end before events are archived by the scheduler,
+# overridable with the ``food_truck_festival.archive_after_days`` parameter.
+ARCHIVE_AFTER_DAYS = 90
 
 
 class EventEvent(models.Model):
@@ -25,6 +58,30 @@ class EventEvent(models.Model):
         string='Map Image',
         help='Upload a floor plan or venue map.  Used for booth placement and portal display.',
     )
+    map_image_512 = fields.Image(
+        string='Map Thumbnail',
+        related='map_image',
+        max_width=512,
+        max_height=512,
+        store=True,
+    )
+    map_tile_ids = fields.One2many('food.map.tile', 'event_id', string='Map Tiles')
+    map_max_zoom = fields.Integer(
+        string='Map Zoom Levels',
+        readonly=True,
+        help='Highest zoom level of the tile pyramid; level 0 fits the whole map in one tile.',
+    )
+    map_width_m = fields.Float(
+        string='Map Width (m)',
+        help='Real-world width covered by the map image.  Enables distance queries in metres between booths.',
+    )
+    food_cuisine_min_distance = fields.Float(
+        string='Same Cuisine Distance (m)',
+        help='Minimum distance kept between booths allocated to vendors of the same cuisine.  '
+             'Leave empty to disable the constraint.',
+    )
+    map_width_px = fields.Integer(string='Map Width (px)', readonly=True)
+    map_height_px = fields.Integer(string='Map Height (px)', readonly=True)
     rules_html = fields.Html(
         string='Event Rules',
         translate=True,
@@ -46,4 +103,359 @@ class EventEvent(models.Model):
         'event_id',
         string='Event Days',
         help='List of individual days for this event.  Vendors select which days they will attend.',
-    )
\ No newline at end of file
+    )
+    food_day_mask = fields.Integer(
+        compute='_compute_food_day_mask',
+        store=True,
+        help='Technical field: occupancy bitset with the bits of all event days set.',
+    )
+    food_package_ids = fields.One2many(
+        'food.event.package',
+        'event_id',
+        string='Pricing Packages',
+        help='Pricelist applied to the applications of each pricing package.',
+    )
+    food_rush_mode = fields.Boolean(
+        string='Rush Mode Intake',
+        help='Stage website applications in a lightweight intake queue and create them in batches.  '
+             'Enable when applications open to absorb the opening-minute rush.',
+    )
+    food_spatial_version = fields.Integer(
+        readonly=True,
+        copy=False,
+        help='Technical field: incremented whenever the booth spatial index of the event must be rebuilt.',
+    )
+    food_season_archived = fields.Boolean(
+        string='Season Archived',
+        readonly=True,
+        copy=False,
+        help='The applications and booths of this event are archived.',
+    )
+    food_booth_product_id = fields.Many2one(
+        'product.product',
+        string='Booth Product',
+        copy=False,
+        help='Service product used on the booth line of every sale order of this event.  '
+             'Created automatically when the first order is generated.',
+    )
+
+    @api.depends('food_event_day_ids.day_index')
+    def _compute_food_day_mask(self):
+        for event in self:
+            mask = 0
+            for day in event.food_event_day_ids:
+                mask |= 1 << day.day_index
+            # events without days are booked as a whole, on a single bit
+            event.food_day_mask = mask or 1
+
+    def _get_food_start_date(self):
+        """Return the first date of the event in its own timezone."""
+        self.ensure_one()
+        if not self.date_begin:
+            return False
+        tz = pytz.timezone(self.date_tz or 'UTC')
+        return pytz.utc.localize(self.date_begin).astimezone(tz).date()
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        events = super().create(vals_list)
+        events.filtered('map_image')._generate_map_tiles()
+        return events
+
+    def write(self, vals):
+        res = super().write(vals)
+        if 'map_image' in vals:
+            self._generate_map_tiles()
+        if 'map_image' in vals or 'map_width_m' in vals:
+            # booth positions are indexed in map units
+            self._bump_food_spatial_version()
+        return res
+
+    def _bump_food_spatial_version(self):
+        """Outdate the cached booth spatial index of the events.
+
+        The version is part of the cache key of the index, so only the
+        index of these events is rebuilt, by every worker, on next use.
+        It is incremented right before commit: a version number is only
+        ever seen along with the booths it describes, and a rolled back
+        transaction leaves it untouched.  Until then the transaction
+        itself bypasses the cache (see ``food.booth._get_spatial_index``).
+        """
+        if not self.ids:
+            return
+        pending = self.env.cr.precommit.data.setdefault('food_spatial.events', set())
+        if not pending:
+            self.env.cr.precommit.add(self._flush_food_spatial_versions)
+        pending.update(self.ids)
+
+    def _flush_food_spatial_versions(self):
+        event_ids = self.env.cr.precommit.data.pop('food_spatial.events', set())
+        if event_ids:
+            self.env.cr.execute(
+                "UPDATE event_event SET food_spatial_version = COALESCE(food_spatial_version, 0) + 1 WHERE id IN %s",
+                [tuple(event_ids)],
+            )
+
+    def _generate_map_tiles(self):
+        """Pre-render the map image of the events into a tile pyramid.
+
+        The highest zoom level renders the image at full resolution; each
+        lower level halves it, down to level 0 where the whole map fits
+        in a single tile.  Existing tiles are replaced.
+        """
+        self.map_tile_ids.unlink()
+        tile_vals = []
+        for event in self:
+            if not event.map_image:
+                event.write({'map_max_zoom': 0, 'map_width_px': 0, 'map_height_px': 0})
+                continue
+            image = Image.open(io.BytesIO(base64.b64decode(event.map_image))).convert('RGB')
+            width, height = image.size
+            max_zoom = max(0, math.ceil(math.log2(max(width, height) / MAP_TILE_SIZE)))
+            for zoom in range(max_zoom, -1, -1):
+                scale = 2 ** (zoom - max_zoom)
+                level = image.resize(
+                    (max(1, round(width * scale)), max(1, round(height * scale))),
+                    Image.LANCZOS,
+                ) if scale != 1 else image
+                for tile_x in range(math.ceil(level.width / MAP_TILE_SIZE)):
+                    for tile_y in range(math.ceil(level.height / MAP_TILE_SIZE)):
+                        box = (
+                            tile_x * MAP_TILE_SIZE, tile_y * MAP_TILE_SIZE,
+                            min((tile_x + 1) * MAP_TILE_SIZE, level.width),
+                            min((tile_y + 1) * MAP_TILE_SIZE, level.height),
+                        )
+                        output = io.BytesIO()
+                        level.crop(box).save(output, format='JPEG', quality=85, optimize=True)
+                        tile_vals.append({
+                            'event_id': event.id,
+                            'zoom': zoom,
+                            'tile_x': tile_x,
+                            'tile_y': tile_y,
+                            'image': base64.b64encode(output.getvalue()),
+                        })
+            event.write({'map_max_zoom': max_zoom, 'map_width_px': width, 'map_height_px': height})
+        self.env['food.map.tile'].create(tile_vals)
+
+    def _get_map_scale(self):
+        """Return the factors converting booth coordinates to map units.
+
+        Booth coordinates are percentages of the map image.  When the
+        real map width is known they are converted to metres, using the
+        image aspect ratio for the vertical axis.
+        """
+        self.ensure_one()
+        if not self.map_width_m:
+            return 1.0, 1.0
+        scale_x = self.map_width_m / 100.0
+        if self.map_width_px and self.map_height_px:
+            return scale_x, scale_x * self.map_height_px / self.map_width_px
+        return scale_x, scale_x
+
+    def action_recompute_food_totals(self):
+        """Recompute the totals of every application of the events.
+
+        Used after repricing a whole festival; applications are processed
+        in chunks so that memory stays bounded on large events.
+        """
+        applications = self.env['food.vendor.application'].search([('event_id', 'in', self.ids)])
+        for batch_ids in split_every(1000, applications.ids):
+            batch = applications.browse(batch_ids)
+            batch._recompute_totals()
+            batch.flush_recordset()
+            self.env.invalidate_all()
+        return True
+
+    def _get_food_booth_product(self):
+        """Return the booth product of the event, creating it once if needed."""
+        self.ensure_one()
+        if not self.food_booth_product_id:
+            self.food_booth_product_id = self.env['product.product'].create({
+                'name': _('Festival Booth - %s') % self.name,
+                'type': 'service',
+                'sale_ok': True,
+                'purchase_ok': False,
+            })
+        return self.food_booth_product_id
+
+    def _get_food_pricelist(self, pricing_package):
+        """Return the pricelist configured for ``pricing_package``, if any."""
+        self.ensure_one()
+        package = self.food_package_ids.filtered(lambda p: p.pricing_package == pricing_package)[:1]
+        return package.pricelist_id
+
+    def action_allocate_food_booths(self, dry_run=False):
+        """Allocate booths to every pending application of the events.
+
+        Pending applications are loaded in one search and handed to the
+        batch allocator of ``food.vendor.application``.  With ``dry_run``
+        the computed assignment is returned without reserving anything.
+        """
+        applications = self.env['food.vendor.application'].search([
+            ('event_id', 'in', self.ids),
+            ('booth_id', '=', False),
+            ('state', 'in', ('new', 'review', 'approved')),
+        ])
+        result = applications.allocate_booths(dry_run=dry_run)
+        if dry_run:
+            return result
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Booth Allocation'),
+                'message': _(
+                    '%(assigned)s booths reserved, %(unassigned)s applications without a suitable booth.',
+                    assigned=len(result['assignments']),
+                    unassigned=len(result['unassigned']),
+                ),
+                'sticky': False,
+            },
+        }
+
+    def action_export_food_applications(self):
+        """Download the applications of the event, streamed by the export route."""
+        self.ensure_one()
+        file_format = self.env.context.get('food_export_format', 'csv')
+        return {
+            'type': 'ir.actions.act_url',
+            'url': '/food/export/%s/applications.%s' % (self.id, file_format),
+            'target': 'download',
+        }
+
+    # Season archiving
+    def action_archive_food_season(self):
+        """Archive the applications and booths of ended events.
+
+        Archived records are left out of every default search, so that
+        the lists, the portal and the allocator of the current season
+        never go through the history of past ones.
+        """
+        if any(not event.date_end or event.date_end > fields.Datetime.now() for event in self):
+            raise UserError(_('Only events that have ended can be archived.'))
+        events = self.filtered(lambda e: not e.food_season_archived)
+        events._set_food_season_active(False)
+        return True
+
+    def action_unarchive_food_season(self):
+        self.filtered('food_season_archived')._set_food_season_active(True)
+        return True
+
+    def _set_food_season_active(self, active):
+        if not self:
+            return
+        domain = [('event_id', 'in', self.ids), ('active', '=', not active)]
+        self.env['food.vendor.application'].with_context(active_test=False, food_digest=True).search(
+            domain,
+        )._write_workflow_state({'active': active}, message=_('Season unarchived.') if active else _('Season archived.'))
+        self.env['food.booth'].with_context(active_test=False).search(domain).write({'active': active})
+        self.food_season_archived = not active
+
+    @api.model
+    def _cron_archive_food_seasons(self):
+        """Archive the seasons of events ended for more than the configured delay."""
+        days = int(self.env['ir.config_parameter'].sudo().get_param(
+            'food_truck_festival.archive_after_days', ARCHIVE_AFTER_DAYS,
+        ))
+        self.search([
+            ('date_end', '<', fields.Datetime.now() - timedelta(days=days)),
+            ('food_season_archived', '=', False),
+            ('food_event_day_ids', '!=', False),
+        ]).action_archive_food_season()
+
+    # Bulk festival setup
+    def action_generate_food_days(self):
+        """Create the missing event days between ``date_begin`` and ``date_end``.
+
+        Dates are taken in the event timezone and all missing days of all
+        events are created with a single multi-record create.
+        """
+        existing = {(day.event_id.id, day.date) for day in self.food_event_day_ids}
+        vals_list = []
+        for event in self.filtered(lambda e: e.date_begin and e.date_end):
+            tz = pytz.timezone(event.date_tz or 'UTC')
+            current = event._get_food_start_date()
+            last = pytz.utc.localize(event.date_end).astimezone(tz).date()
+            while current <= last:
+                if (event.id, current) not in existing:
+                    vals_list.append({'event_id': event.id, 'date': current})
+                current += timedelta(days=1)
+        return self.env['food.event.day'].create(vals_list)
+
+    def _parse_food_booth_layout(self, content, file_format):
+        """Return the raw booth rows of a CSV or GeoJSON layout file.
+
+        GeoJSON features carry the booth columns in their properties; the
+        coordinates, in percentages of the map like ``x_coord`` and
+        ``y_coord``, come from a point geometry or, for polygons, from the
+        centre of their bounding box.  When the width and depth are not
+        given explicitly they are derived from the extent of the bounding
+        box, converted to metres with the map scale (see
+        :meth:`_get_map_scale`); without a known map width they are left
+        empty.
+        """
+        if isinstance(content, bytes):
+            content = content.decode('utf-8-sig')
+        if file_format == 'csv':
+            return list(csv.DictReader(io.StringIO(content)))
+        if file_format != 'geojson':
+            raise UserError(_('Unsupported booth layout format: %s', file_format))
+        scale_x, scale_y = self._get_map_scale() if self.map_width_m else (None, None)
+        rows = []
+        for feature in json.loads(content).get('features', []):
+            row = dict(feature.get('properties') or {})
+            geometry = feature.get('geometry') or {}
+            if geometry.get('type') == 'Point':
+                row.setdefault('x_coord', geometry['coordinates'][0])
+                row.setdefault('y_coord', geometry['coordinates'][1])
+            elif geometry.get('type') == 'Polygon':
+                xs = [point[0] for point in geometry['coordinates'][0]]
+                ys = [point[1] for point in geometry['coordinates'][0]]
+                row.setdefault('x_coord', (min(xs) + max(xs)) / 2)
+                row.setdefault('y_coord', (min(ys) + max(ys)) / 2)
+                if scale_x:
+                    row.setdefault('width_m', (max(xs) - min(xs)) * scale_x)
+                    row.setdefault('depth_m', (max(ys) - min(ys)) * scale_y)
+            rows.append(row)
+        return rows
+
+    def _import_food_booths(self, content, file_format='csv'):
+        """Create the booths described by a layout file in one operation.
+
+        All rows are validated in a single pass and every problem is
+        reported at once; nothing is created unless the whole file is
+        valid.  Booths are then created with one multi-record create.
+
+        :return: the created ``food.booth`` records
+        """
+        self.ensure_one()
+        rows = self._parse_food_booth_layout(content, file_format)
+        taken = set(self.env['food.booth'].search([('event_id', '=', self.id)]).mapped('code'))
+        errors, vals_list = [], []
+        for index, row in enumerate(rows, start=1):
+            vals = {'event_id': self.id}
+            for fname, convert in BOOTH_IMPORT_FIELDS.items():
+                value = row.get(fname)
+                if value in (None, ''):
+                    continue
+                try:
+                    vals[fname] = convert(value)
+                except (TypeError, ValueError):
+                    errors.append(_('Row %(row)s: invalid value %(value)r for %(field)s.', row=index, value=value, field=fname))
+            code = (vals.get('code') or '').strip()
+            if not code:
+                errors.append(_('Row %s: missing booth code.', index))
+                continue
+            if code in taken:
+                errors.append(_('Row %(row)s: booth code %(code)s already exists.', row=index, code=code))
+                continue
+            taken.add(code)
+            vals['code'] = code
+            vals.setdefault('name', code)
+            vals.setdefault('power_kw', self.default_kwh_per_booth)
+            if any(vals.get(fname, 0.0) < 0 for fname in ('width_m', 'depth_m', 'power_kw', 'price_per_day')):
+                errors.append(_('Row %s: sizes, power and price cannot be negative.', index))
+            vals_list.append(vals)
+        if errors:
+            raise UserError('\n'.join(errors[:50]))
+        return self.env['food.booth'].create(vals_list)
@@ -7,7 +7,11 @@ model that enumerates the dates between the begin and end.  Records
 can be created manually or generated via a method on the event.
 """
 
-from odoo import models, fields, api
+from odoo import models, fields, api, _
+from odoo.exceptions import ValidationError
+
+# Occupancy bitsets are stored in 32-bit integer columns.
+MAX_EVENT_DAYS = 31
 
 
 class FoodEventDay(models.Model):
@@ -18,6 +22,25 @@ class FoodEventDay(models.Model):
     event_id = fields.Many2one('event.event', required=True, ondelete='cascade')
     date = fields.Date(required=True)
     name = fields.Char(compute='_compute_name', store=True)
+    day_index = fields.Integer(
+        compute='_compute_day_index',
+        store=True,
+        help='Technical field: position of the day in the event, used as bit index of occupancy bitsets.',
+    )
+
+    @api.depends('event_id.date_begin', 'event_id.date_tz', 'date')
+    def _compute_day_index(self):
+        for day in self:
+            start = day.event_id._get_food_start_date()
+            day.day_index = (day.date - start).days if start and day.date else 0
+
+    @api.constrains('day_index')
+    def _check_day_index(self):
+        for day in self:
+            if not 0 <= day.day_index < MAX_EVENT_DAYS:
+                raise ValidationError(_(
+                    'Event days must fall within the first %s days of the event.', MAX_EVENT_DAYS,
+                ))
 
     @api.depends('event_id', 'date')
     def _compute_name(self):
@@ -0,0 +1,29 @@
+"""
+Map the pricing packages offered to vendors onto event pricelists.
+
+Each event may define one pricelist per package (basic, standard,
+premium).  Service prices of an application and the pricelist of its
+sale order are taken from the pricelist of the chosen package.
+"""
+
+from odoo import fields, models
+
+from .vendor_application import PRICING_PACKAGES
+
+
+class FoodEventPackage(models.Model):
+    _name = 'food.event.package'
+    _description = 'Food Festival Pricing Package'
+    _order = 'event_id, pricing_package'
+
+    event_id = fields.Many2one('event.event', required=True, ondelete='cascade')
+    pricing_package = fields.Selection(PRICING_PACKAGES, string='Pricing Package', required=True)
+    pricelist_id = fields.Many2one('product.pricelist', string='Pricelist', required=True)
+
+    _sql_constraints = [
+        (
+            'unique_event_package',
+            'unique(event_id, pricing_package)',
+            'Each pricing package can only be configured once per event.',
+        ),
+    ]
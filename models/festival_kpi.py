@@ -0,0 +1,173 @@
+"""
+Summary table backing the organiser dashboards of a festival.
+
+One row is kept per event (all days together) and per event day, with
+booth occupancy, application and check-in counts, requested and
+allocated power and revenue per pricing package.  Dashboard reads
+never aggregate the live tables.
+
+Workflow transitions of applications and booths do not touch the
+summary rows themselves: they append the ids of their events to a queue
+table, which every transaction can insert into without waiting for the
+others.  A cron drains the queue every minute and recomputes the rows
+of the queued events once, whatever the number of transactions that
+touched them.
+"""
+
+from odoo import api, fields, models
+
+from .vendor_application import PRICING_PACKAGES
+
+# Application states counted as revenue (contract signed or later).
+REVENUE_STATES = ('signed', 'invoiced', 'checked_in', 'closed')
+
+
+class FoodFestivalKpi(models.Model):
+    _name = 'food.festival.kpi'
+    _description = 'Food Festival KPI'
+    _order = 'event_id, date'
+    _log_access = False
+
+    event_id = fields.Many2one('event.event', required=True, readonly=True, index=True, ondelete='cascade')
+    day_id = fields.Many2one('food.event.day', string='Day', readonly=True, ondelete='cascade',
+                             help='Empty on the row summarising the whole event.')
+    date = fields.Date(readonly=True)
+    booths_total = fields.Integer(string='Booths', readonly=True)
+    booths_booked = fields.Integer(string='Booked Booths', readonly=True)
+    occupancy_rate = fields.Float(string='Occupancy (%)', readonly=True, aggregator='avg')
+    applications_count = fields.Integer(string='Applications', readonly=True)
+    approved_count = fields.Integer(string='Approved', readonly=True)
+    checked_in_count = fields.Integer(string='Checked In', readonly=True)
+    checkin_rate = fields.Float(string='Check‑In Progress (%)', readonly=True, aggregator='avg')
+    power_requested_kw = fields.Float(string='Requested Power (kW)', readonly=True)
+    power_allocated_kw = fields.Float(string='Allocated Power (kW)', readonly=True)
+    revenue_basic = fields.Float(string='Revenue Basic', readonly=True)
+    revenue_standard = fields.Float(string='Revenue Standard', readonly=True)
+    revenue_premium = fields.Float(string='Revenue Premium', readonly=True)
+    revenue_total = fields.Float(string='Revenue', readonly=True)
+
+    def init(self):
+        super().init()
+        # append-only: no key, so concurrent transactions never wait on
+        # each other to queue the same event
+        self.env.cr.execute("""
+            CREATE TABLE IF NOT EXISTS food_festival_kpi_queue (
+                event_id INTEGER NOT NULL REFERENCES event_event(id) ON DELETE CASCADE
+            )
+        """)
+
+    @api.model
+    def _mark_events_dirty(self, event_ids):
+        """Queue a refresh of the KPIs of ``event_ids``.
+
+        The events touched by a transaction are queued with one insert,
+        right before it commits; :meth:`_cron_refresh_dirty_events`
+        recomputes them.
+        """
+        event_ids = set(event_ids) - {False}
+        if not event_ids:
+            return
+        dirty = self.env.cr.precommit.data.setdefault('food_festival_kpi.events', set())
+        if not dirty:
+            self.env.cr.precommit.add(self._queue_dirty_events)
+        dirty.update(event_ids)
+
+    def _queue_dirty_events(self):
+        event_ids = self.env.cr.precommit.data.pop('food_festival_kpi.events', set())
+        if event_ids:
+            self.env.cr.execute(
+                "INSERT INTO food_festival_kpi_queue (event_id) SELECT unnest(%s::int[])",
+                [sorted(event_ids)],
+            )
+
+    @api.model
+    def _cron_refresh_dirty_events(self):
+        """Recompute the KPIs of the events queued since the last run."""
+        self.env.cr.execute("DELETE FROM food_festival_kpi_queue RETURNING event_id")
+        self._refresh({row[0] for row in self.env.cr.fetchall()})
+
+    @api.model
+    def action_refresh_all(self):
+        """Rebuild the KPIs of every event having festival days or booths."""
+        self.env.cr.execute("""
+            SELECT event_id FROM food_event_day
+             UNION
+            SELECT event_id FROM food_booth
+        """)
+        self._refresh({row[0] for row in self.env.cr.fetchall()})
+
+    @api.model
+    def _refresh(self, event_ids):
+        """Recompute the KPI rows of ``event_ids`` with set-based queries."""
+        event_ids = tuple(event_ids)
+        if not event_ids:
+            return
+        self.env.cr.execute("DELETE FROM food_festival_kpi WHERE event_id IN %s", [event_ids])
+        revenue = {
+            package: f"""COALESCE(SUM(CASE WHEN a.pricing_package = '{package}' AND a.state IN %(revenue_states)s
+                                          THEN a.computed_total * a.share END), 0)"""
+            for package, _label in PRICING_PACKAGES
+        }
+        self.env.cr.execute(f"""
+            WITH days AS (
+                SELECT d.id AS day_id, d.event_id, d.date, 1 << d.day_index AS bit
+                  FROM food_event_day d
+                 WHERE d.event_id IN %(events)s
+                 UNION ALL
+                SELECT NULL, e.id, NULL, e.food_day_mask
+                  FROM event_event e
+                 WHERE e.id IN %(events)s
+            ),
+            booths AS (
+                SELECT d.day_id, d.event_id,
+                       COUNT(b.id) AS total,
+                       COUNT(b.id) FILTER (WHERE COALESCE(b.occupancy_mask, 0) & d.bit <> 0) AS booked
+                  FROM days d
+             LEFT JOIN food_booth b ON b.event_id = d.event_id
+              GROUP BY d.day_id, d.event_id
+            ),
+            apps AS (
+                SELECT d.day_id, d.event_id, a.state, a.pricing_package, a.computed_total, a.needs_power_kw,
+                       -- revenue of a day is the share of the days booked
+                       CASE WHEN d.day_id IS NULL THEN 1.0
+                            ELSE 1.0 / GREATEST(LENGTH(REPLACE(a.day_mask::bit(32)::text, '0', '')), 1)
+                       END AS share,
+                       bo.power_kw AS booth_power_kw
+                  FROM days d
+                  JOIN food_vendor_application a
+                    ON a.event_id = d.event_id
+                   AND COALESCE(a.day_mask, 0) & d.bit <> 0
+                   AND a.state != 'rejected'
+             LEFT JOIN food_booth bo ON bo.id = a.booth_id
+            ),
+            app_totals AS (
+                SELECT a.day_id, a.event_id,
+                       COUNT(*) AS applications,
+                       COUNT(*) FILTER (WHERE a.state NOT IN ('new', 'review')) AS approved,
+                       COUNT(*) FILTER (WHERE a.state = 'checked_in') AS checked_in,
+                       COALESCE(SUM(a.needs_power_kw), 0) AS power_requested,
+                       COALESCE(SUM(a.booth_power_kw), 0) AS power_allocated,
+                       {revenue['basic']} AS revenue_basic,
+                       {revenue['standard']} AS revenue_standard,
+                       {revenue['premium']} AS revenue_premium
+                  FROM apps a
+              GROUP BY a.day_id, a.event_id
+            )
+            INSERT INTO food_festival_kpi (
+                event_id, day_id, date, booths_total, booths_booked, occupancy_rate,
+                applications_count, approved_count, checked_in_count, checkin_rate,
+                power_requested_kw, power_allocated_kw,
+                revenue_basic, revenue_standard, revenue_premium, revenue_total
+            )
+            SELECT d.event_id, d.day_id, d.date, b.total, b.booked,
+                   100.0 * b.booked / NULLIF(b.total, 0),
+                   COALESCE(t.applications, 0), COALESCE(t.approved, 0), COALESCE(t.checked_in, 0),
+                   100.0 * t.checked_in / NULLIF(t.approved, 0),
+                   COALESCE(t.power_requested, 0), COALESCE(t.power_allocated, 0),
+                   COALESCE(t.revenue_basic, 0), COALESCE(t.revenue_standard, 0), COALESCE(t.revenue_premium, 0),
+                   COALESCE(t.revenue_basic + t.revenue_standard + t.revenue_premium, 0)
+              FROM days d
+              JOIN booths b ON b.event_id = d.event_id AND b.day_id IS NOT DISTINCT FROM d.day_id
+         LEFT JOIN app_totals t ON t.event_id = d.event_id AND t.day_id IS NOT DISTINCT FROM d.day_id
+        """, {'events': event_ids, 'revenue_states': REVENUE_STATES})
+        self.invalidate_model()
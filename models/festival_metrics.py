@@ -0,0 +1,183 @@
+"""
+Instrumentation of the festival hot paths.
+
+Workflow actions and ``/food`` controllers decorated with
+:func:`instrumented` record their latency, SQL query count and SQL time
+into in-process histograms, exposed in the Prometheus text format by the
+``/food/metrics`` route.  Calls slower than a configurable threshold are
+additionally stored as ``food.slow.call`` records.
+
+Instrumentation is off by default and enabled with the
+``food_truck_festival.instrumentation`` system parameter; when disabled
+a decorated call only costs one cached parameter lookup.  Histograms
+live in the memory of each worker and are reset when it restarts: every
+sample carries the ``worker`` label (the process id), so that the series
+of the workers of a prefork server stay monotonic whichever worker
+serves a scrape, and are summed in the queries (``sum without
+(worker)``).
+"""
+
+import functools
+import os
+import threading
+import time
+from datetime import timedelta
+
+from odoo import api, fields, models
+from odoo.http import request
+from odoo.models import BaseModel
+
+INSTRUMENTATION_PARAM = 'food_truck_festival.instrumentation'
+SLOW_CALL_PARAM = 'food_truck_festival.slow_call_ms'
+METRICS_TOKEN_PARAM = 'food_truck_festival.metrics_token'
+SLOW_CALL_RETENTION_DAYS = 30
+
+# Upper bounds, in seconds, of the latency and SQL time histogram buckets
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, float('inf'))
+# Upper bounds of the query count histogram buckets
+QUERY_BUCKETS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, float('inf'))
+
+
+class Histogram:
+    """Cumulative histogram in the Prometheus sense."""
+
+    __slots__ = ('bounds', 'counts', 'total', 'count')
+
+    def __init__(self, bounds):
+        self.bounds = bounds
+        self.counts = [0] * len(bounds)
+        self.total = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.total += value
+        self.count += 1
+        for index, bound in enumerate(self.bounds):
+            if value <= bound:
+                self.counts[index] += 1
+                break
+
+    def samples(self):
+        """Yield ``(upper bound, cumulative count)`` pairs."""
+        cumulative = 0
+        for bound, count in zip(self.bounds, self.counts):
+            cumulative += count
+            yield bound, cumulative
+
+
+class CallMetrics:
+    """Latency, query count and SQL time histograms per instrumented call."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls = {}
+
+    def observe(self, dbname, name, duration, query_count, query_time, failed):
+        with self._lock:
+            call = self._calls.get((dbname, name))
+            if call is None:
+                call = self._calls[dbname, name] = {
+                    'duration': Histogram(LATENCY_BUCKETS),
+                    'queries': Histogram(QUERY_BUCKETS),
+                    'query_time': Histogram(LATENCY_BUCKETS),
+                    'errors': 0,
+                }
+            call['duration'].observe(duration)
+            call['queries'].observe(query_count)
+            call['query_time'].observe(query_time)
+            call['errors'] += failed
+
+    def reset(self):
+        with self._lock:
+            self._calls.clear()
+
+    def render(self, dbname):
+        """Return the metrics of database ``dbname`` in the Prometheus text format."""
+        worker = os.getpid()
+        with self._lock:
+            calls = sorted((name, call) for (db, name), call in self._calls.items() if db == dbname)
+            lines = []
+            for metric, key, description in (
+                ('food_call_duration_seconds', 'duration', 'Wall time of the call.'),
+                ('food_call_queries', 'queries', 'SQL queries issued by the call.'),
+                ('food_call_query_seconds', 'query_time', 'Time spent in SQL by the call.'),
+            ):
+                lines.append(f'# HELP {metric} {description}')
+                lines.append(f'# TYPE {metric} histogram')
+                for name, call in calls:
+                    histogram = call[key]
+                    for bound, cumulative in histogram.samples():
+                        le = '+Inf' if bound == float('inf') else repr(bound)
+                        lines.append(f'{metric}_bucket{{call="{name}",worker="{worker}",le="{le}"}} {cumulative}')
+                    lines.append(f'{metric}_sum{{call="{name}",worker="{worker}"}} {histogram.total!r}')
+                    lines.append(f'{metric}_count{{call="{name}",worker="{worker}"}} {histogram.count}')
+            lines.append('# HELP food_call_errors_total Calls that raised an exception.')
+            lines.append('# TYPE food_call_errors_total counter')
+            for name, call in calls:
+                lines.append(f'food_call_errors_total{{call="{name}",worker="{worker}"}} {call["errors"]}')
+        return '\n'.join(lines) + '\n'
+
+
+CALL_METRICS = CallMetrics()
+
+
+def instrumented(name):
+    """Decorate a model method or a controller endpoint to be measured as ``name``.
+
+    Model methods use the environment of their recordset, controller
+    endpoints the one of the current request.
+    """
+    def decorator(method):
+        @functools.wraps(method)
+        def wrapper(self, *args, **kwargs):
+            env = self.env if isinstance(self, BaseModel) else request.env
+            config = env['ir.config_parameter'].sudo()
+            if not config.get_param(INSTRUMENTATION_PARAM):
+                return method(self, *args, **kwargs)
+            thread = threading.current_thread()
+            # the cursor only counts queries on threads carrying these
+            if not hasattr(thread, 'query_count'):
+                thread.query_count, thread.query_time = 0, 0.0
+            query_count, query_time = thread.query_count, thread.query_time
+            start = time.perf_counter()
+            failed = True
+            try:
+                result = method(self, *args, **kwargs)
+                failed = False
+                return result
+            finally:
+                duration = time.perf_counter() - start
+                query_count = thread.query_count - query_count
+                query_time = thread.query_time - query_time
+                CALL_METRICS.observe(env.cr.dbname, name, duration, query_count, query_time, failed)
+                threshold = int(config.get_param(SLOW_CALL_PARAM) or 0)
+                if not failed and threshold and duration * 1000 >= threshold:
+                    env['food.slow.call'].sudo().create({
+                        'name': name,
+                        'duration_ms': duration * 1000,
+                        'query_count': query_count,
+                        'query_time_ms': query_time * 1000,
+                        'record_count': len(self) if isinstance(self, BaseModel) else 0,
+                        'user_id': env.uid,
+                    })
+        return wrapper
+    return decorator
+
+
+class FoodSlowCall(models.Model):
+    _name = 'food.slow.call'
+    _description = 'Slow Festival Call'
+    _order = 'id desc'
+
+    name = fields.Char(string='Call', required=True, index=True)
+    duration_ms = fields.Float(string='Duration (ms)', digits=(16, 1))
+    query_count = fields.Integer(string='Queries')
+    query_time_ms = fields.Float(string='SQL Time (ms)', digits=(16, 1))
+    record_count = fields.Integer(string='Records')
+    user_id = fields.Many2one('res.users', string='User', ondelete='set null')
+
+    @api.autovacuum
+    def _gc_slow_calls(self):
+        """Drop the slow call log entries past the retention period."""
+        limit = fields.Datetime.now() - timedelta(days=SLOW_CALL_RETENTION_DAYS)
+        self.search([('create_date', '<', limit)]).unlink()
@@ -0,0 +1,30 @@
+"""
+Store the pre-rendered tiles of an event's venue map.
+
+Serving the full resolution floor plan to every phone is wasteful, so
+the map image is cut into a pyramid of fixed size tiles when it is
+uploaded.  The portal then only downloads the tiles of the visible
+area at the current zoom level.
+"""
+
+from odoo import fields, models
+
+
+class FoodMapTile(models.Model):
+    _name = 'food.map.tile'
+    _description = 'Food Festival Map Tile'
+    _order = 'event_id, zoom, tile_x, tile_y'
+
+    event_id = fields.Many2one('event.event', required=True, ondelete='cascade')
+    zoom = fields.Integer(required=True)
+    tile_x = fields.Integer(required=True)
+    tile_y = fields.Integer(required=True)
+    image = fields.Binary(attachment=True, required=True)
+
+    _sql_constraints = [
+        (
+            'unique_event_tile',
+            'unique(event_id, zoom, tile_x, tile_y)',
+            'A map tile can only exist once per event and zoom level.',
+        ),
+    ]
@@ -0,0 +1,122 @@
+"""
+Render vendor badges, one per page or several per sheet.
+
+Badge assets (check-in token and QR image) are prepared for the whole
+selection before rendering, so the QWeb templates only read cached
+values.  Large batches of sheets are split in chunks converted to PDF
+by parallel wkhtmltopdf processes and merged afterwards.
+"""
+
+import logging
+import os
+import subprocess
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
+
+from odoo import _, api, models
+from odoo.addons.base.models.ir_actions_report import _get_wkhtmltopdf_bin
+from odoo.exceptions import UserError
+from odoo.tools import split_every
+from odoo.tools.pdf import merge_pdf
+
+_logger = logging.getLogger(__name__)
+
+# Badges laid out on one A4 sheet (2 columns x 4 rows).
+BADGES_PER_SHEET = 8
+# Badges rendered per wkhtmltopdf process and number of processes.
+BADGE_CHUNK_SIZE = 400
+BADGE_WORKERS = 4
+
+
+class ReportFoodBadge(models.AbstractModel):
+    _name = 'report.food_truck_festival.report_badge'
+    _description = 'Food Festival Badge Report'
+
+    @api.model
+    def _get_report_values(self, docids, data=None):
+        docs = self.env['food.vendor.application'].browse(docids)
+        docs._prepare_badge_assets()
+        return {
+            'doc_ids': docids,
+            'doc_model': 'food.vendor.application',
+            'docs': docs,
+        }
+
+
+class ReportFoodBadgeSheet(models.AbstractModel):
+    _name = 'report.food_truck_festival.report_badge_sheet'
+    _description = 'Food Festival Badge Sheet Report'
+
+    @api.model
+    def _get_report_values(self, docids, data=None):
+        docs = self.env['food.vendor.application'].browse(docids)
+        docs._prepare_badge_assets()
+        return {
+            'doc_ids': docids,
+            'doc_model': 'food.vendor.application',
+            'docs': docs,
+            'sheets': [docs.browse(ids) for ids in split_every(BADGES_PER_SHEET, docs.ids)],
+        }
+
+    @api.model
+    def _render_sheets_pdf(self, applications, chunk_size=BADGE_CHUNK_SIZE, workers=BADGE_WORKERS):
+        """Render badge sheets of many applications into one PDF.
+
+        HTML is rendered chunk by chunk in the current transaction; the
+        expensive HTML to PDF conversion of the chunks runs in parallel
+        wkhtmltopdf processes, whose outputs are merged in order.
+        """
+        report_ref = 'food_truck_festival.action_report_badge_sheet'
+        Report = self.env['ir.actions.report']
+        report = Report._get_report(report_ref)
+        applications._prepare_badge_assets()
+        args = Report._build_wkhtmltopdf_args(report.get_paperformat(), False)
+        jobs = []
+        for ids in split_every(chunk_size, applications.ids):
+            html = Report._render_qweb_html(report_ref, list(ids))[0]
+            bodies = Report._prepare_html(html, report_model=report.model)[0]
+            jobs.append(bodies)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            pdfs = list(executor.map(lambda bodies: self._run_wkhtmltopdf_chunk(args, bodies), jobs))
+        return merge_pdf(pdfs) if len(pdfs) > 1 else pdfs[0]
+
+    @api.model
+    def _run_wkhtmltopdf_chunk(self, args, bodies):
+        """Convert HTML bodies to PDF with a dedicated wkhtmltopdf process.
+
+        Runs outside of the ORM: it only touches temporary files, so it
+        can safely be called from worker threads.
+        """
+        with tempfile.TemporaryDirectory(prefix='food_badges_') as tmpdir:
+            paths = []
+            for index, body in enumerate(bodies):
+                path = os.path.join(tmpdir, f'body_{index}.html')
+                with open(path, 'wb') as body_file:
+                    body_file.write(body.encode() if isinstance(body, str) else body)
+                paths.append(path)
+            output = os.path.join(tmpdir, 'badges.pdf')
+            process = subprocess.run(
+                [_get_wkhtmltopdf_bin()] + args + paths + [output],
+                capture_output=True, check=False,
+            )
+            if process.returncode not in (0, 1):
+                _logger.error('wkhtmltopdf failed: %s', process.stderr.decode(errors='replace'))
+                raise UserError(_('Badge sheet rendering failed.'))
+            with open(output, 'rb') as pdf_file:
+                return pdf_file.read()
+
+    @api.model
+    def action_print_sheets(self, applications):
+        """Render badge sheets and return an action downloading them."""
+        pdf = self._render_sheets_pdf(applications)
+        attachment = self.env['ir.attachment'].create({
+            'name': _('Badges.pdf'),
+            'type': 'binary',
+            'raw': pdf,
+            'mimetype': 'application/pdf',
+        })
+        return {
+            'type': 'ir.actions.act_url',
+            'url': f'/web/content/{attachment.id}?download=true',
+            'target': 'self',
+        }
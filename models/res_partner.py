@@ -0,0 +1,141 @@
+"""
+Partner matching keys used to recognise returning vendors.
+
+VAT numbers and email addresses are stored on partners in a normalized,
+indexed form so that the applications of a whole intake batch are
+resolved to existing partners with a single query, and so that
+duplicates created by earlier seasons can be found and merged.
+
+Phone numbers are deliberately not matching keys: applications are
+submitted anonymously, and a phone number is too easy to know, or to
+share, to attach an application to an existing partner.
+"""
+
+import re
+
+from odoo import api, fields, models
+from odoo.exceptions import UserError
+from odoo.tools import email_normalize, split_every
+
+# Partners merged per call of the merge wizard, the target included
+PARTNER_MERGE_CHUNK = 3
+
+
+def normalize_vat(vat):
+    return re.sub(r'[^0-9A-Z]', '', (vat or '').upper()) or False
+
+
+def normalize_email(email):
+    return email_normalize(email or '') or False
+
+
+class ResPartner(models.Model):
+    _inherit = 'res.partner'
+
+    food_vat_key = fields.Char(compute='_compute_food_match_keys', store=True, index='btree_not_null')
+    food_email_key = fields.Char(compute='_compute_food_match_keys', store=True, index='btree_not_null')
+
+    @api.depends('vat', 'email')
+    def _compute_food_match_keys(self):
+        for partner in self:
+            partner.food_vat_key = normalize_vat(partner.vat)
+            partner.food_email_key = normalize_email(partner.email)
+
+    @api.model
+    def _food_match_partners(self, keys_list):
+        """Resolve lists of matching keys to existing commercial partners.
+
+        :param keys_list: list of ``(vat_key, email_key)`` tuples
+        :return: list of partners (possibly empty) in the same order; a
+            VAT match wins over an email match
+        """
+        fnames = ('food_vat_key', 'food_email_key')
+        values = [{keys[index] for keys in keys_list if keys[index]} for index in range(len(fnames))]
+        domains = [[(fname, 'in', list(keys))] for fname, keys in zip(fnames, values) if keys]
+        if not domains:
+            return [self.browse()] * len(keys_list)
+        partners = self.search_fetch(
+            [('parent_id', '=', False)] + ['|'] * (len(domains) - 1) + [leaf for domain in domains for leaf in domain],
+            list(fnames), order='id',
+        )
+        # the oldest partner wins when several share a key
+        by_key = [{} for _fname in fnames]
+        for partner in partners:
+            for index, fname in enumerate(fnames):
+                if partner[fname]:
+                    by_key[index].setdefault(partner[fname], partner)
+        result = []
+        for keys in keys_list:
+            match = next((by_key[index][key] for index, key in enumerate(keys) if key in by_key[index]), None)
+            result.append(match or self.browse())
+        return result
+
+    @api.model
+    def _food_duplicate_groups(self, limit=None):
+        """Return lists of ids of vendor partners sharing a VAT number or an email.
+
+        Only commercial partners of vendor applications are considered;
+        the partners of companies and users are never merged away.
+        """
+        self.flush_model(['food_vat_key', 'food_email_key', 'parent_id', 'active'])
+        self.env['food.vendor.application'].flush_model(['partner_id'])
+        self.env.cr.execute("""
+            WITH vendors AS (
+                SELECT p.id, p.food_vat_key, p.food_email_key
+                  FROM res_partner p
+                 WHERE p.parent_id IS NULL AND p.active
+                   AND EXISTS (SELECT 1 FROM food_vendor_application a WHERE a.partner_id = p.id)
+                   AND NOT EXISTS (SELECT 1 FROM res_company c WHERE c.partner_id = p.id)
+                   AND NOT EXISTS (SELECT 1 FROM res_users u WHERE u.partner_id = p.id)
+            )
+            SELECT array_agg(id ORDER BY id)
+              FROM (
+                    SELECT id, 'vat' AS kind, food_vat_key AS key
+                      FROM vendors
+                     WHERE food_vat_key IS NOT NULL
+                 UNION ALL
+                    SELECT id, 'email', food_email_key
+                      FROM vendors
+                     WHERE food_email_key IS NOT NULL
+                   ) keys
+          GROUP BY kind, key
+            HAVING COUNT(*) > 1
+          ORDER BY MIN(id)
+             LIMIT %s
+        """, [limit])
+        # a partner can share its VAT with some partners and its email with
+        # others: keep it in the first group only
+        seen, groups = set(), []
+        for (ids,) in self.env.cr.fetchall():
+            ids = [partner_id for partner_id in ids if partner_id not in seen]
+            if len(ids) > 1:
+                seen.update(ids)
+                groups.append(ids)
+        return groups
+
+    @api.model
+    def _food_merge_duplicates(self, limit=None):
+        """Merge the duplicate partners found by :meth:`_food_duplicate_groups`.
+
+        Every group is merged into its oldest partner with the standard
+        partner merge, which moves all references (applications, orders,
+        invoices, messages...) to the kept partner.  The safety checks of
+        the merge are kept: a group it refuses (different emails, journal
+        items of another partner...) is left untouched and reported.
+
+        :return: ``(merged, refused)``, the number of partners merged away
+            and the lists of ids of the refused groups
+        """
+        Merge = self.env['base.partner.merge.automatic.wizard']
+        merged, refused = 0, []
+        for ids in self._food_duplicate_groups(limit):
+            target = self.browse(ids[0])
+            try:
+                with self.env.cr.savepoint():
+                    for chunk in split_every(PARTNER_MERGE_CHUNK - 1, ids[1:]):
+                        Merge._merge([target.id, *chunk], target)
+            except UserError:
+                refused.append(ids)
+                continue
+            merged += len(ids) - 1
+        return merged, refused
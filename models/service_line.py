@@ -40,12 +40,40 @@ class FoodServiceLine(models.Model):
     )
     currency_id = fields.Many2one('res.currency', related='application_id.currency_id', store=True)
 
+    @api.model_create_multi
+    def create(self, vals_list):
+        lines = super().create(vals_list)
+        # lines created without an explicit price get the pricelist price
+        lines.browse(
+            line.id for line, vals in zip(lines, vals_list) if 'price_unit' not in vals
+        )._resolve_prices()
+        return lines
+
     @api.onchange('product_id')
     def _onchange_product_price(self):
-        """Default the unit price based on the product list price."""
-        for line in self:
-            if line.product_id:
-                line.price_unit = line.product_id.lst_price
+        """Default the unit price based on the application pricelist."""
+        self._resolve_prices()
+
+    def _resolve_prices(self):
+        """Set the unit price of all lines in ``self`` in batch.
+
+        Lines are grouped by the pricelist of their application's
+        pricing package and by quantity, so that each group is priced
+        with a single pricelist evaluation.  Lines without a pricelist
+        fall back to the product list price.
+        """
+        groups = {}
+        for line in self.filtered('product_id'):
+            pricelist = line.application_id._get_pricelist() if line.application_id.event_id else False
+            groups.setdefault((pricelist, line.qty or 1.0), []).append(line)
+        for (pricelist, qty), lines in groups.items():
+            products = self.env['product.product'].union(*(line.product_id for line in lines))
+            if pricelist:
+                prices = pricelist._get_products_price(products, quantity=qty)
+            else:
+                prices = {product.id: product.lst_price for product in products}
+            for line in lines:
+                line.price_unit = prices[line.product_id.id]
 
     @api.depends('qty', 'price_unit')
     def _compute_subtotal(self):
@@ -0,0 +1,38 @@
+"""
+Hook the vendor application workflow into completed signatures.
+
+When a sign request is completed, the linked applications are marked
+as signed through the workflow of the applications, with one indexed
+lookup and a single write (tracked, or logged as a digest note for
+large batches, like any other transition).  Invoicing is
+left to the batch invoicing job so that the signing flow itself stays
+fast.
+"""
+
+from odoo import _, models
+
+# States of a sign request meaning that every signer has signed.
+SIGN_COMPLETED_STATES = ('signed', 'completed')
+
+
+class SignRequest(models.Model):
+    _inherit = 'sign.request'
+
+    def write(self, vals):
+        completing = self.browse()
+        if vals.get('state') in SIGN_COMPLETED_STATES:
+            completing = self.filtered(lambda r: r.state not in SIGN_COMPLETED_STATES)
+        res = super().write(vals)
+        if completing:
+            completing._food_handle_completion()
+        return res
+
+    def _food_handle_completion(self):
+        """Mark the applications of the completed requests as signed."""
+        applications = self.env['food.vendor.application'].sudo().search([
+            ('sign_request_id', 'in', self.ids),
+            ('state', 'in', ('contract_sent', 'approved')),
+        ])
+        if applications:
+            applications._write_workflow_state({'state': 'signed'}, message=_('Contract signed.'))
+            self.env.ref('food_truck_festival.ir_cron_invoice_signed_applications').sudo()._trigger()
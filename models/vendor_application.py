@@ -8,11 +8,103 @@ the system automatically assigns a booth, generates a contract for
 e‑signature, and creates a sale order and invoice upon signature.
 """
 
+import base64
+import hashlib
+import logging
 import secrets
+import threading
+from bisect import bisect_left
 from datetime import date
 
+from markupsafe import Markup
+from psycopg2 import errors
+
 from odoo import api, fields, models, _
-from odoo.exceptions import ValidationError, UserError
+from odoo.exceptions import AccessError, ValidationError, UserError
+from odoo.tools import split_every
+from odoo.tools.lru import LRU
+from odoo.tools.sql import create_index
+
+from .festival_metrics import instrumented
+from .res_partner import normalize_email, normalize_vat
+
+_logger = logging.getLogger(__name__)
+
+# Weights used by the booth allocator when scoring how well a booth fits
+# an application.  Unused utilities are penalised more heavily than
+# unused floor space or power because they are the scarcest resource.
+ALLOCATION_AREA_WEIGHT = 1.0
+ALLOCATION_POWER_WEIGHT = 1.0
+ALLOCATION_UTILITY_WEIGHT = 2.0
+# Bonus granted to booths already booked on other days, so that shared
+# booths are filled up before untouched ones.
+ALLOCATION_SHARED_BONUS = 0.5
+# Planning rounds of a batch allocation: the applications whose planned
+# booth was taken by a concurrent approver are planned again, on other
+# booths, at most this many times.
+ALLOCATION_LOCK_ROUNDS = 3
+
+# Number of signed applications turned into orders and invoices per
+# batch; larger signing waves are deferred to the invoicing cron.
+INVOICE_BATCH_SIZE = 200
+
+# Number of leading sha256 bytes of a check-in token shipped to offline
+# gate scanners.  Eight bytes keep the manifest small while making
+# accidental collisions between badges negligible.
+SCANNER_HASH_BYTES = 8
+
+# States in which a badge is valid at the gate, for offline scanners
+SCANNER_STATES = ('approved', 'contract_sent', 'signed', 'invoiced', 'checked_in')
+
+# Per-process cache of check-in tokens: (dbname, token) -> application id.
+# Tokens never change once generated, so only hits are cached and no
+# invalidation is needed; stale ids of deleted applications are checked
+# on use.
+CHECKIN_TOKEN_CACHE = LRU(8192)
+
+# Contracts sent per dispatch run (the cron runs every minute) unless
+# overridden by the food_truck_festival.contract_dispatch_rate parameter,
+# and number of attempts before a contract is flagged as failed.
+CONTRACT_DISPATCH_RATE = 50
+CONTRACT_DISPATCH_MAX_ATTEMPTS = 3
+
+# Application fields whose change affects the festival KPIs.
+KPI_FIELDS = {'state', 'booth_id', 'day_ids', 'pricing_package', 'needs_power_kw', 'event_id'}
+
+# States from which the list view mass actions may move an application,
+# per target state, and the workflow action performing each move.
+BULK_TRANSITION_SOURCES = {
+    'review': ('new',),
+    'approved': ('review',),
+    'rejected': ('new', 'review', 'approved'),
+    'checked_in': ('signed', 'invoiced'),
+}
+# Groups allowed to check vendors in, including the read-only gate staff
+CHECKIN_GROUPS = (
+    'food_truck_festival.group_food_organiser',
+    'food_truck_festival.group_food_logistics',
+)
+BULK_TRANSITION_ACTIONS = {
+    'review': 'action_submit',
+    'approved': 'action_approve',
+    'rejected': 'action_reject',
+    'checked_in': 'action_check_in',
+}
+# Skipped applications listed by name in the mass action notification
+BULK_FAILURE_REPORT_LIMIT = 10
+
+# Selections at least this large are processed in quiet mode: per-record
+# tracking and chatter posts are replaced by one digest note per event.
+# The ``food_digest`` context key forces the mode on or off.
+DIGEST_THRESHOLD = 50
+DIGEST_LISTED_APPLICATIONS = 100
+QUIET_CONTEXT = {'tracking_disable': True, 'mail_create_nolog': True, 'mail_notrack': True}
+
+PRICING_PACKAGES = [
+    ('basic', 'Basic'),
+    ('standard', 'Standard'),
+    ('premium', 'Premium'),
+]
 
 
 class FoodVendorApplication(models.Model):
@@ -41,6 +133,11 @@ class FoodVendorApplication(models.Model):
 
     menu_description = fields.Html(string='Menu Description', translate=True)
     allergen_category_ids = fields.Many2many('res.partner.category', string='Allergens')
+    cuisine_id = fields.Many2one(
+        'res.partner.category',
+        string='Cuisine',
+        help='Kind of food served.  Used to keep vendors of the same cuisine apart when allocating booths.',
+    )
     truck_width = fields.Float(string='Truck Width (m)')
     truck_depth = fields.Float(string='Truck Depth (m)')
     needs_power_kw = fields.Float(string='Power Required (kW)', help='Power consumption requested by the vendor.')
@@ -48,15 +145,20 @@ class FoodVendorApplication(models.Model):
     needs_sewage = fields.Boolean(string='Needs Sewage')
 
     event_id = fields.Many2one('event.event', string='Event', required=True, tracking=True)
+    active = fields.Boolean(
+        default=True,
+        help='Applications of archived festival seasons are kept out of the day-to-day screens.',
+    )
     day_ids = fields.Many2many('food.event.day', string='Days')
+    day_mask = fields.Integer(
+        compute='_compute_day_mask',
+        store=True,
+        help='Technical field: bitset of the event days booked; all days when none are selected.',
+    )
     booth_id = fields.Many2one('food.booth', string='Assigned Booth')
     service_line_ids = fields.One2many('food.service.line', 'application_id', string='Service Lines')
 
-    pricing_package = fields.Selection([
-        ('basic', 'Basic'),
-        ('standard', 'Standard'),
-        ('premium', 'Premium'),
-    ], string='Pricing Package', default='basic')
+    pricing_package = fields.Selection(PRICING_PACKAGES, string='Pricing Package', default='basic')
     computed_subtotal = fields.Monetary(string='Subtotal', compute='_compute_totals', store=True)
     taxes = fields.Monetary(string='Taxes', compute='_compute_totals', store=True)
     computed_total = fields.Monetary(string='Total', compute='_compute_totals', store=True)
@@ -74,11 +176,31 @@ class FoodVendorApplication(models.Model):
         ('closed', 'Closed'),
     ], default='new', tracking=True)
 
-    sign_request_id = fields.Many2one('sign.request', string='Sign Request')
+    sign_request_id = fields.Many2one('sign.request', string='Sign Request', index='btree_not_null')
+    contract_dispatch_state = fields.Selection([
+        ('queued', 'Queued'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ], string='Contract Dispatch', copy=False, readonly=True)
+    contract_dispatch_attempts = fields.Integer(string='Dispatch Attempts', copy=False, readonly=True)
+    contract_dispatch_error = fields.Char(string='Dispatch Error', copy=False, readonly=True)
+    invoice_error = fields.Char(string='Invoicing Error', copy=False, readonly=True)
     sale_order_id = fields.Many2one('sale.order', string='Sale Order')
     invoice_id = fields.Many2one('account.move', string='Invoice')
-    portal_token = fields.Char(string='Portal Token', copy=False)
+    portal_token = fields.Char(string='Portal Token', copy=False, index='btree_not_null')
+    checkin_qr = fields.Binary(
+        string='Check‑In QR Code',
+        attachment=True,
+        copy=False,
+        help='Cached QR code image of the check-in URL, generated once and reused on every badge print.',
+    )
     checkin_time = fields.Datetime(string='Check‑In Time')
+    checkin_logged = fields.Boolean(
+        string='Check‑In Logged',
+        default=True,
+        copy=False,
+        help='Technical field: cleared on check-in until the chatter message is posted by the scheduler.',
+    )
 
     # related fields
     booth_power_kw = fields.Float(related='booth_id.power_kw', string='Booth Power', readonly=True)
@@ -94,37 +216,200 @@ class FoodVendorApplication(models.Model):
             else:
                 app.currency_id = self.env.company.currency_id
 
-    @api.depends('booth_id', 'service_line_ids.subtotal', 'day_ids')
+    @api.depends('day_ids.day_index', 'event_id.food_day_mask')
+    def _compute_day_mask(self):
+        for app in self:
+            mask = 0
+            for day in app.day_ids:
+                mask |= 1 << day.day_index
+            app.day_mask = mask or app.event_id.food_day_mask
+
+    @api.depends(
+        'booth_id.price_per_day', 'day_ids', 'partner_id', 'currency_id',
+        'event_id.company_id.account_sale_tax_id',
+        'event_id.food_booth_product_id.taxes_id.amount', 'event_id.food_booth_product_id.taxes_id.amount_type',
+        'service_line_ids.subtotal',
+        'service_line_ids.product_id.taxes_id.amount', 'service_line_ids.product_id.taxes_id.amount_type',
+    )
     def _compute_totals(self):
+        """Compute untaxed amount, taxes and total of many applications.
+
+        Every (taxes, price, quantity) combination is evaluated once with
+        ``account.tax.compute_all`` and shared by all lines using it, so
+        repricing a whole event costs one tax evaluation per distinct
+        price rather than one per line.  The cache lives for one call
+        only; changing a price or the rate of a tax recomputes the
+        applications using it.
+        """
+        tax_cache = {}
+
+        def compute(taxes, price, qty, currency, partner):
+            key = (taxes, price, qty, currency, partner)
+            if key not in tax_cache:
+                if taxes:
+                    res = taxes.compute_all(price, currency=currency, quantity=qty, partner=partner)
+                    tax_cache[key] = (res['total_excluded'], res['total_included'])
+                else:
+                    amount = price * qty
+                    tax_cache[key] = (amount, amount)
+            return tax_cache[key]
+
         for app in self:
-            subtotal = 0.0
+            company = app.event_id.company_id or self.env.company
+            currency = app.currency_id or company.currency_id
+            partner = app.partner_id or None
+            untaxed = total = 0.0
             # price for booth per day
             if app.booth_id:
-                days_count = len(app.day_ids) or 1
-                subtotal += (app.booth_id.price_per_day or 0.0) * days_count
+                booth_taxes = (
+                    app.event_id.food_booth_product_id.taxes_id or company.account_sale_tax_id
+                ).filtered(lambda t: t.company_id == company)
+                excluded, included = compute(
+                    booth_taxes, app.booth_id.price_per_day or 0.0, len(app.day_ids) or 1, currency, partner,
+                )
+                untaxed += excluded
+                total += included
             # service lines
-            subtotal += sum(app.service_line_ids.mapped('subtotal'))
-            app.computed_subtotal = subtotal
-            # compute taxes using company's tax; simple 0 for placeholder
-            tax = 0.0
-            app.taxes = tax
-            app.computed_total = subtotal + tax
+            for line in app.service_line_ids:
+                line_taxes = line.product_id.taxes_id.filtered(lambda t: t.company_id == company)
+                excluded, included = compute(
+                    line_taxes, line.price_unit or 0.0, line.qty or 0.0, currency, partner,
+                )
+                untaxed += excluded
+                total += included
+            app.computed_subtotal = untaxed
+            app.taxes = total - untaxed
+            app.computed_total = total
+
+    def _recompute_totals(self):
+        """Force the recomputation of the stored totals of ``self``."""
+        for fname in ('computed_subtotal', 'taxes', 'computed_total'):
+            self.env.add_to_compute(self._fields[fname], self)
+        self._recompute_recordset(['computed_subtotal', 'taxes', 'computed_total'])
+
+    def init(self):
+        super().init()
+        cr = self.env.cr
+        # default list order and per-event screens of the current seasons
+        create_index(cr, 'food_vendor_application_active_id_idx', self._table, ['id DESC'], where='active')
+        create_index(cr, 'food_vendor_application_event_state_idx', self._table, ['event_id', 'state'], where='active')
+        # portal lists of a vendor, newest first
+        create_index(cr, 'food_vendor_application_partner_id_idx', self._table, ['partner_id', 'id DESC'], where='active')
+        # work queues of the invoicing and contract dispatch crons
+        create_index(
+            cr, 'food_vendor_application_to_invoice_idx', self._table, ['id'],
+            where="state = 'signed' AND invoice_id IS NULL",
+        )
+        create_index(
+            cr, 'food_vendor_application_dispatch_queue_idx', self._table, ['id'],
+            where="contract_dispatch_state = 'queued'",
+        )
+
+    @api.model_create_multi
+    def create(self, vals_list):
+        apps = super().create(vals_list)
+        self.env['food.festival.kpi']._mark_events_dirty(apps.event_id.ids)
+        return apps
+
+    def write(self, vals):
+        if KPI_FIELDS.intersection(vals):
+            # the previous event too, when applications are moved
+            self.env['food.festival.kpi']._mark_events_dirty(self.event_id.ids)
+        res = super().write(vals)
+        if KPI_FIELDS.intersection(vals):
+            self.env['food.festival.kpi']._mark_events_dirty(self.event_id.ids)
+        return res
+
+    @api.model
+    def _reserve_application_numbers(self, count):
+        """Draw ``count`` application numbers from the sequence at once.
+
+        Standard sequences hand out a block of values in one ``nextval``
+        query and no-gap sequences are advanced by a single update, so a
+        batch of applications takes the sequence lock only once.
+        """
+        sequence = self.env['ir.sequence'].sudo().search([
+            ('code', '=', 'food.vendor.application'),
+            ('company_id', 'in', [self.env.company.id, False]),
+        ], order='company_id', limit=1)
+        if not sequence or not count:
+            return [_('New')] * count
+        if sequence.use_date_range:
+            return [sequence._next() for _i in range(count)]
+        if sequence.implementation == 'standard':
+            self.env.cr.execute(
+                "SELECT nextval(%s) FROM generate_series(1, %s)",
+                ['ir_sequence_%03d' % sequence.id, count],
+            )
+            numbers = [row[0] for row in self.env.cr.fetchall()]
+        else:
+            step = sequence.number_increment
+            self.env.cr.execute("""
+                UPDATE ir_sequence
+                   SET number_next = number_next + %s
+                 WHERE id = %s
+             RETURNING number_next - %s
+            """, [step * count, sequence.id, step * count])
+            start = self.env.cr.fetchone()[0]
+            numbers = range(start, start + step * count, step)
+            sequence.invalidate_recordset(['number_next'])
+        prefix, suffix = sequence._get_prefix_suffix()
+        return [prefix + '%%0%sd' % sequence.padding % number + suffix for number in numbers]
 
     def _ensure_partner(self):
-        """Create or update partner if not already set."""
-        for app in self:
-            if not app.partner_id:
-                vals = {
-                    'name': app.company_name_fallback or 'New Vendor',
-                    'vat': app.vat_fallback,
-                    'phone': app.phone_fallback,
-                    'email': app.email_fallback,
-                    'company_type': 'company',
-                    'customer_rank': 1,
-                }
-                partner = self.env['res.partner'].create(vals)
-                app.partner_id = partner.id
-            return app.partner_id
+        """Return the partner of the application, matching or creating it if needed."""
+        self.ensure_one()
+        self._ensure_partners()
+        return self.partner_id
+
+    def _partner_match_keys(self):
+        self.ensure_one()
+        return (
+            normalize_vat(self.vat_fallback),
+            normalize_email(self.email_fallback),
+        )
+
+    def _ensure_partners(self):
+        """Set the partner of every application of the selection lacking one.
+
+        Returning vendors are recognised by their normalized VAT number
+        or email (see ``res.partner._food_match_partners``), all in
+        one query; the others get a new partner, shared by the
+        applications of the batch carrying the same keys, and created with
+        one ``create``.
+        """
+        apps = self.filtered(lambda a: not a.partner_id)
+        if not apps:
+            return
+        keys_list = [app._partner_match_keys() for app in apps]
+        matches = self.env['res.partner']._food_match_partners(keys_list)
+        groups, group_by_key = [], {}
+        for app, keys, partner in zip(apps, keys_list, matches):
+            if partner:
+                app.partner_id = partner
+                continue
+            # applications of the batch sharing any key get the same partner
+            keyed = [(index, key) for index, key in enumerate(keys) if key]
+            group = next((group_by_key[key] for key in keyed if key in group_by_key), None)
+            if group is None:
+                group = []
+                groups.append(group)
+            group.append(app)
+            for key in keyed:
+                group_by_key.setdefault(key, group)
+        if not groups:
+            return
+        partners = self.env['res.partner'].create([{
+            'name': group[0].company_name_fallback or 'New Vendor',
+            'vat': group[0].vat_fallback,
+            'phone': group[0].phone_fallback,
+            'email': group[0].email_fallback,
+            'company_type': 'company',
+            'customer_rank': 1,
+        } for group in groups])
+        for group, partner in zip(groups, partners):
+            for app in group:
+                app.partner_id = partner
 
     def _check_documents(self):
         """Placeholder for required document validation.  Should be
@@ -135,152 +420,887 @@ class FoodVendorApplication(models.Model):
             # In a real implementation, you would check compliance lines or attachments
             pass
 
+    # Quiet mode for bulk operations
+    def _is_quiet_batch(self):
+        return self.env.context.get('food_digest', len(self) >= DIGEST_THRESHOLD)
+
+    def _write_workflow_state(self, vals, message=None):
+        """Write the workflow ``vals`` on the selection and log ``message``.
+
+        Bulk selections are written without tracking and logged with one
+        digest note per event (see :meth:`_post_digest`) instead of a
+        tracking value and a message on every application.
+        """
+        if not self._is_quiet_batch():
+            self.write(vals)
+            if message:
+                for app in self:
+                    app.message_post(body=message)
+            return
+        self.with_context(**QUIET_CONTEXT).write(vals)
+        if not message:
+            labels = dict(self._fields['state']._description_selection(self.env))
+            message = _('Moved to %s.', labels[vals['state']])
+        self._post_digest(message)
+
+    def _post_digest(self, message):
+        """Post ``message`` once per event as an internal note listing the applications."""
+        for event, apps in self.grouped('event_id').items():
+            if not event:
+                continue
+            names = apps[:DIGEST_LISTED_APPLICATIONS].mapped('name')
+            if len(apps) > DIGEST_LISTED_APPLICATIONS:
+                names.append(_('and %s more', len(apps) - DIGEST_LISTED_APPLICATIONS))
+            event.message_post(
+                body=Markup('<p>%s</p><p>%s</p>') % (
+                    message, _('%(count)s applications: %(names)s', count=len(apps), names=', '.join(names)),
+                ),
+                subtype_xmlid='mail.mt_note',
+            )
+
+    def _send_vendor_notifications(self, template):
+        """Send ``template`` to the vendors of the selection, one email per vendor.
+
+        Vendors with a single application get the template; vendors with
+        several get one email listing all of them, rendered from the
+        ``email_template_vendor_applications_received`` template in the
+        language of the vendor.
+        """
+        by_recipient = {}
+        for app in self:
+            recipient = (app.email_fallback or app.partner_id.email or '').strip().lower()
+            by_recipient.setdefault(recipient or app.id, []).append(app.id)
+        grouped_template = self.env.ref(
+            'food_truck_festival.email_template_vendor_applications_received', raise_if_not_found=False,
+        )
+        groups = [ids for ids in by_recipient.values() if len(ids) > 1] if grouped_template else []
+        single_ids = [app_id for ids in by_recipient.values() if ids not in groups for app_id in ids]
+        if single_ids:
+            template.send_mail_batch(single_ids)
+        for ids in groups:
+            grouped_template.with_context(food_application_ids=ids).send_mail(ids[0])
+
     # Workflow actions
+    @instrumented('application.submit')
     def action_submit(self):
-        for app in self:
-            app._ensure_partner()
-            app.state = 'review'
+        self._ensure_partners()
+        self._write_workflow_state({'state': 'review'})
         return True
 
+    @instrumented('application.approve')
     def action_approve(self):
-        for app in self:
-            # ensure documents
-            app._check_documents()
-            # assign booth if not set
-            if not app.booth_id:
-                booth = app._find_available_booth()
-                if not booth:
-                    raise UserError(_('No suitable booth available.'))
-                booth.write({'state': 'reserved', 'application_id': app.id})
-                app.booth_id = booth
-            # check requested power vs booth
-            if app.needs_power_kw and app.booth_id and app.needs_power_kw > app.booth_id.power_kw:
-                raise ValidationError(_('Requested power exceeds booth capability.'))
-            app.state = 'approved'
-            # generate portal token if missing
-            if not app.portal_token:
-                app.portal_token = secrets.token_urlsafe(16)
+        # assign booths to every application lacking one in a single pass
+        self._check_documents()
+        pending = self.filtered(lambda a: not a.booth_id)
+        if pending:
+            result = pending.allocate_booths()
+            if result['unassigned']:
+                raise UserError(_('No suitable booth available.'))
+        if any(app._exceeds_booth_power() for app in self):
+            raise ValidationError(_('Requested power exceeds booth capability.'))
+        self._write_workflow_state({'state': 'approved'})
+        self.filtered(lambda a: not a.portal_token)._assign_portal_tokens()
         return True
 
+    def _exceeds_booth_power(self):
+        self.ensure_one()
+        return bool(self.needs_power_kw and self.booth_id and self.needs_power_kw > self.booth_id.power_kw)
+
+    def _assign_portal_tokens(self):
+        """Give every application of ``self`` a new portal token in one update."""
+        if not self:
+            return
+        self.flush_recordset(['portal_token'])
+        self.env.cr.execute("""
+            UPDATE food_vendor_application a
+               SET portal_token = v.token
+              FROM unnest(%s::int[], %s::varchar[]) AS v(app_id, token)
+             WHERE a.id = v.app_id
+        """, [self.ids, [secrets.token_urlsafe(16) for _app in self]])
+        self.invalidate_recordset(['portal_token'])
+
     def _find_available_booth(self):
         """Find an available booth matching the requirements (size, utilities)."""
         self.ensure_one()
-        domain = [
-            ('event_id', '=', self.event_id.id),
+        plan = self._plan_booth_allocation()
+        return plan.get(self.id, self.env['food.booth'])
+
+    # Booth allocation
+    @api.model
+    def _booth_fit_score(self, app, booth):
+        """Score how well ``booth`` hosts ``app``; lower is better.
+
+        Both arguments are the plain tuples built by
+        :meth:`_plan_booth_allocation`.  Returns ``None`` when the booth
+        cannot host the truck at all.
+        """
+        _app_id, width, depth, power, water, sewage = app
+        _booth_id, b_width, b_depth, b_power, b_water, b_sewage = booth
+        if (water and not b_water) or (sewage and not b_sewage) or power > b_power:
+            return None
+        # trucks may be parked rotated by 90 degrees
+        fits = (width <= b_width and depth <= b_depth) or (width <= b_depth and depth <= b_width)
+        if not fits:
+            return None
+        b_area = b_width * b_depth
+        area_waste = (b_area - width * depth) / b_area if b_area else 0.0
+        power_waste = (b_power - power) / b_power if b_power else 0.0
+        utility_waste = (b_water and not water) + (b_sewage and not sewage)
+        return (
+            ALLOCATION_AREA_WEIGHT * area_waste
+            + ALLOCATION_POWER_WEIGHT * power_waste
+            + ALLOCATION_UTILITY_WEIGHT * utility_waste
+        )
+
+    def _plan_booth_allocation(self, exclude=()):
+        """Compute booth assignments for the applications in ``self``.
+
+        Available booths of all concerned events are loaded in one query.
+        A booth can host several applications as long as their days do
+        not overlap (see ``day_mask`` and ``food.booth.occupancy_mask``).
+        Applications are then placed most-constrained first (sewage,
+        water, power, truck area) on the booth with the lowest fit score,
+        so that well-equipped booths are kept for the trucks that need
+        them instead of going to whoever is approved first.
+
+        Booths are not locked here: :meth:`allocate_booths` only locks
+        the booths of the plan.  The ids of ``exclude`` are left out, for
+        booths taken by a concurrent allocation.
+
+        When the event sets a minimum distance between vendors of the same
+        cuisine, booths closer than that to a booth already holding the
+        cuisine are skipped, using the booth spatial index.
+
+        :return: dict mapping application ids to ``food.booth`` records
+        """
+        apps = self.filtered(lambda a: a.event_id)
+        if not apps:
+            return {}
+        Booth = self.env['food.booth']
+        booths = Booth.search([
+            ('event_id', 'in', apps.event_id.ids),
             ('state', '=', 'available'),
-        ]
-        if self.needs_water:
-            domain.append(('water', '=', True))
-        if self.needs_sewage:
-            domain.append(('sewage', '=', True))
-        if self.needs_power_kw:
-            domain.append(('power_kw', '>=', self.needs_power_kw))
-        # optionally filter by size
-        booth = self.env['food.booth'].search(domain, limit=1)
-        return booth
+            ('id', 'not in', list(exclude)),
+        ])
+        booths.fetch(['event_id', 'width_m', 'depth_m', 'power_kw', 'water', 'sewage', 'occupancy_mask'])
+        # booked days of each booth, updated as applications are placed
+        masks = {booth.id: booth.occupancy_mask for booth in booths}
+        # event -> list of booth tuples sorted by power for bisecting
+        booths_by_event = {}
+        for booth in booths:
+            booths_by_event.setdefault(booth.event_id.id, []).append((
+                booth.id, booth.width_m or 0.0, booth.depth_m or 0.0,
+                booth.power_kw or 0.0, booth.water, booth.sewage,
+            ))
+        for candidates in booths_by_event.values():
+            candidates.sort(key=lambda b: b[3])
+        powers_by_event = {
+            event_id: [b[3] for b in candidates]
+            for event_id, candidates in booths_by_event.items()
+        }
+
+        def demand(app):
+            return (
+                app.needs_sewage, app.needs_water, app.needs_power_kw or 0.0,
+                (app.truck_width or 0.0) * (app.truck_depth or 0.0),
+            )
+
+        # (event, cuisine) -> booths already holding that cuisine
+        constrained_events = apps.event_id.filtered('food_cuisine_min_distance')
+        cuisine_booths = {}
+        if constrained_events:
+            for placed in self.search_fetch([
+                ('event_id', 'in', constrained_events.ids),
+                ('booth_id', '!=', False),
+                ('cuisine_id', '!=', False),
+            ], ['event_id', 'booth_id', 'cuisine_id']):
+                cuisine_booths.setdefault((placed.event_id.id, placed.cuisine_id.id), set()).add(placed.booth_id.id)
 
+        def blocked(app, booth_id):
+            taken = cuisine_booths.get((app.event_id.id, app.cuisine_id.id))
+            if not taken:
+                return False
+            grid = Booth._get_spatial_index(app.event_id.id)
+            entry = grid.positions.get(booth_id)
+            if not entry:
+                return False
+            return any(
+                near[0] in taken
+                for _distance, near in grid.within(entry[1], entry[2], app.event_id.food_cuisine_min_distance)
+            )
+
+        plan = {}
+        for app in apps.sorted(demand, reverse=True):
+            candidates = booths_by_event.get(app.event_id.id)
+            if not candidates:
+                continue
+            constrained = app.cuisine_id and app.event_id.food_cuisine_min_distance
+            profile = (
+                app.id, app.truck_width or 0.0, app.truck_depth or 0.0,
+                app.needs_power_kw or 0.0, app.needs_water, app.needs_sewage,
+            )
+            powers = powers_by_event[app.event_id.id]
+            best_index, best_score = None, None
+            for index in range(bisect_left(powers, profile[3]), len(candidates)):
+                booth_mask = masks[candidates[index][0]]
+                if booth_mask & app.day_mask:
+                    continue
+                score = self._booth_fit_score(profile, candidates[index])
+                if score is None:
+                    continue
+                if booth_mask:
+                    score -= ALLOCATION_SHARED_BONUS
+                if best_score is not None and score >= best_score:
+                    continue
+                if constrained and blocked(app, candidates[index][0]):
+                    continue
+                best_index, best_score = index, score
+            if best_index is None:
+                continue
+            booth = candidates[best_index]
+            masks[booth[0]] |= app.day_mask
+            full = app.event_id.food_day_mask
+            if masks[booth[0]] & full == full:
+                candidates.pop(best_index)
+                powers.pop(best_index)
+            plan[app.id] = self.env['food.booth'].browse(booth[0])
+            if constrained:
+                cuisine_booths.setdefault((app.event_id.id, app.cuisine_id.id), set()).add(booth[0])
+        return plan
+
+    @instrumented('application.allocate_booths')
+    def allocate_booths(self, dry_run=False):
+        """Assign booths to all applications in ``self`` without one.
+
+        The assignment is solved for the whole recordset at once (see
+        :meth:`_plan_booth_allocation`).  Unless ``dry_run`` is set, only
+        the booths of the plan are then row-locked, skipping those held by
+        a concurrent approver, and the reservations are written with one
+        set-based update of the booth and application tables.  The
+        applications whose booth was skipped are planned again on the
+        other booths, up to ``ALLOCATION_LOCK_ROUNDS`` times.
+
+        :return: dict with an ``assignments`` list of
+            ``{'application_id', 'booth_id'}`` dicts and the list of
+            ``unassigned`` application ids
+        """
+        pending = self.filtered(lambda a: not a.booth_id and a.state not in ('rejected', 'closed'))
+        Booth = self.env['food.booth']
+        if len(pending) == 1 and not dry_run and not (pending.cuisine_id and pending.event_id.food_cuisine_min_distance):
+            # a single approval claims its booth in one atomic statement
+            try:
+                with self.env.cr.savepoint():
+                    booth = Booth._claim_booth(pending)
+            except errors.SerializationFailure:
+                # the chosen booth changed since our snapshot: plan around it
+                pass
+            else:
+                return {
+                    'assignments': [{'application_id': pending.id, 'booth_id': booth.id}] if booth else [],
+                    'unassigned': [] if booth else pending.ids,
+                }
+        if dry_run:
+            plan = pending._plan_booth_allocation()
+        else:
+            plan, skipped, todo = {}, set(), pending
+            for _round in range(ALLOCATION_LOCK_ROUNDS):
+                round_plan = todo._plan_booth_allocation(exclude=skipped)
+                locked = Booth._lock_booths({booth.id for booth in round_plan.values()})
+                won = {app_id: booth for app_id, booth in round_plan.items() if booth.id in locked}
+                self._reserve_booths(won)
+                plan.update(won)
+                lost = {booth.id for booth in round_plan.values()} - locked
+                if not lost:
+                    break
+                skipped |= lost
+                todo = self.browse([app_id for app_id, booth in round_plan.items() if booth.id in lost])
+        return {
+            'assignments': [
+                {'application_id': app_id, 'booth_id': booth.id}
+                for app_id, booth in plan.items()
+            ],
+            'unassigned': [app_id for app_id in pending.ids if app_id not in plan],
+        }
+
+    def _reserve_booths(self, plan):
+        """Write the reservations of ``plan`` on locked booths and their applications.
+
+        :param plan: dict mapping application ids to ``food.booth`` records
+        """
+        if not plan:
+            return
+        self.env.flush_all()
+        app_ids = list(plan)
+        booth_ids = [plan[app_id].id for app_id in app_ids]
+        # booked days and first application of every booth
+        booth_masks, booth_apps, booth_full = {}, {}, {}
+        for app in self.browse(app_ids):
+            booth_id = plan[app.id].id
+            booth_masks[booth_id] = booth_masks.get(booth_id, 0) | app.day_mask
+            booth_apps.setdefault(booth_id, app.id)
+            booth_full[booth_id] = app.event_id.food_day_mask
+        reserved_ids = list(booth_masks)
+        self.env.cr.execute("""
+            UPDATE food_booth b
+               SET occupancy_mask = COALESCE(b.occupancy_mask, 0) | v.mask,
+                   state = CASE WHEN (COALESCE(b.occupancy_mask, 0) | v.mask) & v.full_mask = v.full_mask
+                                THEN 'reserved' ELSE b.state END,
+                   application_id = COALESCE(b.application_id, v.app_id),
+                   write_uid = %s, write_date = (now() at time zone 'UTC')
+              FROM unnest(%s::int[], %s::int[], %s::int[], %s::int[]) AS v(booth_id, app_id, mask, full_mask)
+             WHERE b.id = v.booth_id
+        """, [
+            self.env.uid,
+            reserved_ids,
+            [booth_apps[booth_id] for booth_id in reserved_ids],
+            [booth_masks[booth_id] for booth_id in reserved_ids],
+            [booth_full[booth_id] for booth_id in reserved_ids],
+        ])
+        self.env.cr.execute("""
+            UPDATE food_vendor_application a
+               SET booth_id = v.booth_id,
+                   write_uid = %s, write_date = (now() at time zone 'UTC')
+              FROM unnest(%s::int[], %s::int[]) AS v(booth_id, app_id)
+             WHERE a.id = v.app_id
+        """, [self.env.uid, booth_ids, app_ids])
+        apps = self.browse(app_ids)
+        booths = self.env['food.booth'].browse(booth_ids)
+        booths.invalidate_recordset([
+            'state', 'occupancy_mask', 'application_id', 'reservation_ids', 'write_uid', 'write_date',
+        ])
+        apps.invalidate_recordset(['booth_id', 'write_uid', 'write_date'])
+        apps.modified(['booth_id'])
+        self.env['food.festival.kpi']._mark_events_dirty(apps.event_id.ids)
+
+    @instrumented('application.reject')
     def action_reject(self):
-        for app in self:
-            app.state = 'rejected'
+        self._write_workflow_state({'state': 'rejected'})
         return True
 
+    # Bulk transitions, offered as list view mass actions
+    def _bulk_transition(self, state):
+        """Move the selection to ``state``, skipping the records that cannot be.
+
+        The whole selection is validated up front, then the valid records
+        are moved together by the workflow action of ``state``, so that a
+        single failing record does not abort the batch.
+
+        :return: tuple of the moved applications and of a dict mapping the
+            other applications to the reason they were skipped
+        """
+        labels = dict(self._fields['state']._description_selection(self.env))
+        sources = BULK_TRANSITION_SOURCES[state]
+        failures = {
+            app: _('cannot move from %(source)s to %(target)s', source=labels[app.state], target=labels[state])
+            for app in self if app.state not in sources
+        }
+        candidates = self.browse([app.id for app in self if app not in failures])
+        if state == 'approved' and candidates:
+            failures.update(candidates._check_bulk_approval())
+            candidates = candidates.browse([app.id for app in candidates if app not in failures])
+        if candidates:
+            getattr(candidates, BULK_TRANSITION_ACTIONS[state])()
+        return candidates, failures
+
+    def _check_bulk_approval(self):
+        """Return the applications of ``self`` that cannot be approved, with the reason.
+
+        Booths are allocated to the whole selection in one pass; the
+        applications left without one are reported instead of failing
+        the approval of the others.
+        """
+        failures = {}
+        try:
+            self._check_documents()
+        except UserError:
+            for app in self:
+                try:
+                    app._check_documents()
+                except UserError as error:
+                    failures[app] = error.args[0]
+        pending = self.filtered(lambda a: a not in failures and not a.booth_id)
+        if pending:
+            unassigned = pending.allocate_booths()['unassigned']
+            failures.update(dict.fromkeys(self.browse(unassigned), _('no suitable booth available')))
+        for app in self:
+            if app not in failures and app._exceeds_booth_power():
+                failures[app] = _('requested power exceeds booth capability')
+        return failures
+
+    def _bulk_transition_action(self, state):
+        """Run :meth:`_bulk_transition` and report the outcome as a notification."""
+        done, failures = self._bulk_transition(state)
+        labels = dict(self._fields['state']._description_selection(self.env))
+        message = _('%(count)s applications moved to %(state)s.', count=len(done), state=labels[state])
+        if failures:
+            details = [
+                '%s: %s' % (app.name or app.display_name, reason)
+                for app, reason in list(failures.items())[:BULK_FAILURE_REPORT_LIMIT]
+            ]
+            if len(failures) > BULK_FAILURE_REPORT_LIMIT:
+                details.append(_('and %s more.', len(failures) - BULK_FAILURE_REPORT_LIMIT))
+            message = '%s\n%s\n%s' % (message, _('%s applications skipped:', len(failures)), '\n'.join(details))
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Applications'),
+                'message': message,
+                'type': 'warning' if failures else 'success',
+                'sticky': bool(failures),
+                'next': {'type': 'ir.actions.act_window_close'},
+            },
+        }
+
+    def action_bulk_submit(self):
+        return self._bulk_transition_action('review')
+
+    def action_bulk_approve(self):
+        return self._bulk_transition_action('approved')
+
+    def action_bulk_reject(self):
+        return self._bulk_transition_action('rejected')
+
+    def action_bulk_check_in(self):
+        """Check the selection in on behalf of the gate staff.
+
+        Logistics users only read applications: the check-in, and nothing
+        else, is written as superuser once their group and their read
+        access to the selection have been verified.
+        """
+        if not any(self.env.user.has_group(group) for group in CHECKIN_GROUPS):
+            raise AccessError(_('Only organisers and logistics staff can check vendors in.'))
+        self.check_access('read')
+        return self.sudo()._bulk_transition_action('checked_in')
+
+    @instrumented('application.send_contract')
     def action_send_contract(self):
-        """Create a sign request from a predefined template and send to vendor."""
+        """Queue the contracts of the selection for e‑signature.
+
+        Sign requests are created and sent in the background by
+        :meth:`_cron_dispatch_contracts`, so sending the contracts of a
+        whole event does not hold the user's request.
+        """
         template = self.env.ref('food_truck_festival.sign_template_vendor_contract', raise_if_not_found=False)
-        for app in self:
-            if not template:
-                raise UserError(_('Sign template not configured.'))
-            # ensure partner exists
-            partner = app._ensure_partner()
-            # prepare sign request
-            sign_request = self.env['sign.request'].create({
-                'template_id': template.id,
-                'signer_ids': [(0, 0, {
-                    'partner_id': partner.id,
-                    'role_id': template.signer_ids and template.signer_ids[0].role_id.id or False,
-                })],
-                'reference': app.name,
-            })
+        if not template:
+            raise UserError(_('Sign template not configured.'))
+        apps = self.filtered(lambda a: a.contract_dispatch_state != 'queued' and not a.sign_request_id)
+        apps.write({
+            'contract_dispatch_state': 'queued',
+            'contract_dispatch_attempts': 0,
+            'contract_dispatch_error': False,
+        })
+        self.env.ref('food_truck_festival.ir_cron_dispatch_contracts')._trigger()
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Contracts'),
+                'message': _('%s contracts queued for sending.', len(apps)),
+                'sticky': False,
+            },
+        }
+
+    def _prepare_sign_request_vals(self, template):
+        self.ensure_one()
+        # ensure partner exists
+        partner = self._ensure_partner()
+        role = template.sign_item_ids.responsible_id[:1] or self.env.ref('sign.sign_item_role_default')
+        return {
+            'template_id': template.id,
+            'request_item_ids': [(0, 0, {
+                'partner_id': partner.id,
+                'role_id': role.id,
+                'mail_sent_order': 1,
+            })],
+            'reference': self.name,
+        }
+
+    @api.model
+    def _cron_dispatch_contracts(self):
+        """Send queued contracts, at most ``contract_dispatch_rate`` per run.
+
+        Only approved applications are sent; the ones that left that
+        state since they were queued are dropped from the queue.  Sign
+        requests of a run are created with one multi-record create, or one
+        by one in savepoints when the batch fails; each one is then sent
+        in its own savepoint.  Failures are retried on the next runs until
+        ``CONTRACT_DISPATCH_MAX_ATTEMPTS`` is reached, after which the
+        application is flagged as failed.
+        """
+        template = self.env.ref('food_truck_festival.sign_template_vendor_contract', raise_if_not_found=False)
+        if not template:
+            return
+        rate = int(self.env['ir.config_parameter'].sudo().get_param(
+            'food_truck_festival.contract_dispatch_rate', CONTRACT_DISPATCH_RATE,
+        ))
+        queued_domain = [('contract_dispatch_state', '=', 'queued')]
+        self.search(queued_domain + [('state', '!=', 'approved')]).write({'contract_dispatch_state': False})
+        queued_domain.append(('state', '=', 'approved'))
+        apps = self.search(queued_domain, order='id', limit=rate)
+        if not apps:
+            return
+        SignRequest = self.env['sign.request']
+        try:
+            with self.env.cr.savepoint():
+                sign_requests = list(SignRequest.create([
+                    app._prepare_sign_request_vals(template) for app in apps
+                ]))
+        except Exception:
+            # find out which applications break the batch
+            sign_requests = []
+            for app in apps:
+                try:
+                    with self.env.cr.savepoint():
+                        sign_requests.append(SignRequest.create(app._prepare_sign_request_vals(template)))
+                except Exception as e:
+                    app._record_dispatch_failure(e)
+                    sign_requests.append(SignRequest)
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        sent = self.browse()
+        for app, sign_request in zip(apps, sign_requests):
+            if not sign_request:
+                continue
+            try:
+                with self.env.cr.savepoint():
+                    sign_request.action_sent()
+            except Exception as e:
+                app._record_dispatch_failure(e)
+                sign_request.unlink()
+                continue
             app.sign_request_id = sign_request
-            app.state = 'contract_sent'
-            # Send the request
-            sign_request.action_sent()
-            # Post a message to the chatter
-            app.message_post(body=_('Contract sent for e‑signature.'))
-        return True
+            sent |= app
+        sent._write_workflow_state({
+            'state': 'contract_sent',
+            'contract_dispatch_state': 'sent',
+            'contract_dispatch_error': False,
+        }, message=_('Contract sent for e‑signature.'))
+        if auto_commit:
+            self.env.cr.commit()
+        remaining = self.search_count(queued_domain)
+        self.env['ir.cron']._notify_progress(done=len(apps), remaining=remaining)
+
+    def _record_dispatch_failure(self, error):
+        """Count a failed contract dispatch, flagging the application once out of attempts."""
+        self.ensure_one()
+        _logger.warning('Sending contract of %s failed: %s', self.name, error)
+        attempts = self.contract_dispatch_attempts + 1
+        self.write({
+            'contract_dispatch_attempts': attempts,
+            'contract_dispatch_error': str(error),
+            'contract_dispatch_state': 'failed' if attempts >= CONTRACT_DISPATCH_MAX_ATTEMPTS else 'queued',
+        })
 
+    @instrumented('application.mark_signed')
     def action_mark_signed(self):
-        """Called when the contract is signed.  Create a sale order and invoice."""
-        for app in self:
-            if app.state not in ('contract_sent', 'approved'):
-                continue
-            app.state = 'signed'
-            # create sale order
-            order = app._create_sale_order()
+        """Called when the contract is signed.  Create a sale order and invoice.
+
+        Small selections are invoiced right away.  Larger signing waves
+        are only marked as signed here and handed over to the invoicing
+        cron, which processes them in committed chunks.
+        """
+        apps = self.filtered(lambda a: a.state in ('contract_sent', 'approved'))
+        if not apps:
+            return True
+        apps._write_workflow_state({'state': 'signed'})
+        if len(apps) > INVOICE_BATCH_SIZE:
+            self.env.ref('food_truck_festival.ir_cron_invoice_signed_applications')._trigger()
+            return True
+        apps._create_sale_documents()
+        return True
+
+    def _create_sale_documents(self):
+        """Create the sale orders and draft invoices of signed applications.
+
+        Orders and invoices of the whole recordset are created with one
+        multi-record ``create`` each; invoice lines are part of the
+        invoice values instead of being added by a second write.
+        """
+        apps = self.filtered(lambda a: a.state == 'signed' and not a.invoice_id)
+        if not apps:
+            return self.browse()
+        # documents of a bulk selection are created without creation logs
+        env = self.with_context(**QUIET_CONTEXT).env if apps._is_quiet_batch() else self.env
+        orders = env['sale.order'].create(apps._prepare_sale_order_vals())
+        invoices = env['account.move'].create([
+            app._prepare_invoice_vals(order) for app, order in zip(apps, orders)
+        ])
+        for app, order, invoice in zip(apps, orders, invoices):
             app.sale_order_id = order
-            # create invoice
-            invoice = app._create_invoice(order)
             app.invoice_id = invoice
-            app.state = 'invoiced'
-            app.message_post(body=_('Contract signed. Sales order and invoice generated.'))
-        return True
+        apps._write_workflow_state(
+            {'state': 'invoiced'},
+            message=_('Contract signed. Sales order and invoice generated.'),
+        )
+        return apps
+
+    def _get_pricelist(self):
+        """Return the event pricelist matching the application's package."""
+        self.ensure_one()
+        return self.event_id._get_food_pricelist(self.pricing_package)
+
+    def _prepare_sale_order_vals(self):
+        """Return the ``sale.order`` values of every application in ``self``."""
+        vals_list = []
+        for app in self:
+            order_vals = {
+                'partner_id': app.partner_id.id,
+                'origin': app.name,
+                'state': 'draft',
+                'order_line': [],
+            }
+            pricelist = app._get_pricelist()
+            if pricelist:
+                order_vals['pricelist_id'] = pricelist.id
+            # Booth line, on the shared booth product of the event
+            if app.booth_id:
+                order_vals['order_line'].append((0, 0, {
+                    'product_id': app.event_id._get_food_booth_product().id,
+                    'name': _('Festival Booth %s') % app.booth_id.name,
+                    'product_uom_qty': len(app.day_ids) or 1,
+                    'price_unit': app.booth_id.price_per_day,
+                }))
+            # Service lines
+            for line in app.service_line_ids:
+                order_vals['order_line'].append((0, 0, {
+                    'product_id': line.product_id.id,
+                    'product_uom_qty': line.qty,
+                    'price_unit': line.price_unit,
+                }))
+            vals_list.append(order_vals)
+        return vals_list
 
     def _create_sale_order(self):
         self.ensure_one()
-        order_vals = {
-            'partner_id': self.partner_id.id,
-            'origin': self.name,
-            'state': 'draft',
-            'order_line': [],
-        }
-        # Booth line
-        if self.booth_id:
-            product = self.env['product.product'].create({
-                'name': _('Festival Booth %s') % self.booth_id.name,
-                'type': 'service',
-                'lst_price': self.booth_id.price_per_day,
-                'sale_ok': True,
-            })
-            order_vals['order_line'].append((0, 0, {
-                'product_id': product.id,
-                'product_uom_qty': len(self.day_ids) or 1,
-                'price_unit': self.booth_id.price_per_day,
-            }))
-        # Service lines
-        for line in self.service_line_ids:
-            order_vals['order_line'].append((0, 0, {
-                'product_id': line.product_id.id,
-                'product_uom_qty': line.qty,
-                'price_unit': line.price_unit,
-            }))
-        order = self.env['sale.order'].create(order_vals)
+        order = self.env['sale.order'].create(self._prepare_sale_order_vals())
         # confirm order to generate deliveries/invoice triggers; we leave in draft for manager to confirm
         return order
 
+    def _prepare_invoice_vals(self, order):
+        """Return the draft invoice values for ``order``, lines included."""
+        invoice_vals = order._prepare_invoice()
+        invoice_vals['invoice_line_ids'] = [(0, 0, {
+            'product_id': line.product_id.id,
+            'name': line.name,
+            'quantity': line.product_uom_qty,
+            'price_unit': line.price_unit,
+            'tax_ids': [(6, 0, line.tax_id.ids)],
+        }) for line in order.order_line]
+        return invoice_vals
+
     def _create_invoice(self, order):
         """Create a draft invoice from the sale order."""
-        invoice_vals = order._prepare_invoice()
-        invoice = self.env['account.move'].create(invoice_vals)
-        # Add invoice lines from order
-        invoice_line_vals = []
-        for line in order.order_line:
-            invoice_line_vals.append((0, 0, {
-                'product_id': line.product_id.id,
-                'name': line.name,
-                'quantity': line.product_uom_qty,
-                'price_unit': line.price_unit,
-                'tax_ids': [(6, 0, [])],
-            }))
-        invoice.write({'invoice_line_ids': invoice_line_vals})
-        return invoice
+        return self.env['account.move'].create(self._prepare_invoice_vals(order))
+
+    @api.model
+    def _cron_invoice_signed_applications(self, batch_size=INVOICE_BATCH_SIZE):
+        """Invoice signed applications in chunks, committing each chunk.
+
+        Applications are picked up by state, so a run interrupted by a
+        timeout simply resumes with the remaining ones.  A failing chunk
+        is invoiced again one application at a time, each in a savepoint:
+        the applications that still fail get an ``invoice_error`` and are
+        skipped by the next runs until :meth:`action_retry_invoicing`.
+        """
+        apps = self.search([
+            ('state', '=', 'signed'), ('invoice_id', '=', False), ('invoice_error', '=', False),
+        ], order='id')
+        auto_commit = not getattr(threading.current_thread(), 'testing', False)
+        done, remaining = 0, len(apps)
+        for batch_ids in split_every(batch_size, apps.ids):
+            batch = self.browse(batch_ids)
+            try:
+                with self.env.cr.savepoint():
+                    batch._create_sale_documents()
+            except Exception:
+                _logger.warning('Invoicing of signed applications %s failed, retrying one by one', batch_ids)
+                for app in batch:
+                    try:
+                        with self.env.cr.savepoint():
+                            app._create_sale_documents()
+                    except Exception as e:
+                        _logger.warning('Invoicing of signed application %s failed: %s', app.name, e)
+                        app.invoice_error = str(e)
+            if auto_commit:
+                self.env.cr.commit()
+            done += len(batch_ids)
+            remaining -= len(batch_ids)
+            self.env['ir.cron']._notify_progress(done=done, remaining=remaining)
+            self.env.invalidate_all()
 
+    def action_retry_invoicing(self):
+        """Hand the applications flagged by the invoicing cron back to it."""
+        self.filtered('invoice_error').invoice_error = False
+        self.env.ref('food_truck_festival.ir_cron_invoice_signed_applications')._trigger()
+        return True
+
+    @instrumented('application.check_in')
     def action_check_in(self):
-        for app in self:
-            app.checkin_time = fields.Datetime.now()
-            app.state = 'checked_in'
-            app.message_post(body=_('Vendor checked in at %s') % app.checkin_time)
+        """Check the vendors in; already checked-in applications are left as is.
+
+        The chatter message is posted later by :meth:`_cron_log_checkins`
+        to keep check-in at the gate as cheap as possible.
+        """
+        apps = self.filtered(lambda a: a.state not in ('checked_in', 'closed'))
+        apps._write_workflow_state({
+            'checkin_time': fields.Datetime.now(),
+            'state': 'checked_in',
+            'checkin_logged': False,
+        })
         return True
 
+    @api.model
+    def _resolve_checkin_token(self, token):
+        """Return the application owning ``token`` or an empty recordset.
+
+        Lookups go through the partial index on ``portal_token`` and hits
+        are kept in a per-process cache.
+        """
+        if not token:
+            return self.browse()
+        key = (self.env.cr.dbname, token)
+        app_id = CHECKIN_TOKEN_CACHE.get(key)
+        if app_id is None:
+            self.env.cr.execute(
+                "SELECT id FROM food_vendor_application WHERE portal_token = %s LIMIT 1",
+                [token],
+            )
+            row = self.env.cr.fetchone()
+            if not row:
+                return self.browse()
+            app_id = CHECKIN_TOKEN_CACHE[key] = row[0]
+        app = self.browse(app_id).exists()
+        if not app:
+            CHECKIN_TOKEN_CACHE.pop(key, None)
+        return app
+
+    @api.model
+    @instrumented('application.checkin_by_token')
+    def _checkin_by_token(self, token):
+        """Check in the application owning ``token`` with a single update.
+
+        Scanning the same badge twice is harmless: the update only
+        matches applications that are not checked in yet.  Like the gate
+        scanners, only applications in :data:`SCANNER_STATES` are let in.
+
+        :return: tuple ``(application, newly_checked_in)``
+        """
+        app = self._resolve_checkin_token(token)
+        if not app:
+            return app, False
+        app.flush_recordset(['state'])
+        self.env.cr.execute("""
+            UPDATE food_vendor_application
+               SET state = 'checked_in', checkin_time = (now() at time zone 'UTC'),
+                   checkin_logged = false,
+                   write_uid = %s, write_date = (now() at time zone 'UTC')
+             WHERE id = %s AND state IN %s AND state != 'checked_in'
+         RETURNING id
+        """, [self.env.uid, app.id, SCANNER_STATES])
+        checked_in = bool(self.env.cr.fetchone())
+        if checked_in:
+            app.invalidate_recordset(['state', 'checkin_time', 'checkin_logged', 'write_uid', 'write_date'])
+            app.modified(['state', 'checkin_time'])
+            self.env['food.festival.kpi']._mark_events_dirty(app.event_id.ids)
+        return app, checked_in
+
+    @api.model
+    def _hash_checkin_token(self, token):
+        """Return the truncated digest of ``token`` used by gate scanners."""
+        return hashlib.sha256(token.encode()).digest()[:SCANNER_HASH_BYTES]
+
+    @api.model
+    def _get_scanner_manifest(self, event):
+        """Return the compact check-in manifest of ``event`` for offline scanners.
+
+        Tokens are shipped as sorted, truncated sha256 digests packed in a
+        single base64 string, so scanners can validate badges locally
+        with a binary search without ever holding the tokens themselves.
+        """
+        self.env.cr.execute("""
+            SELECT portal_token, state = 'checked_in'
+              FROM food_vendor_application
+             WHERE event_id = %s AND portal_token IS NOT NULL
+               AND state IN %s
+        """, [event.id, SCANNER_STATES])
+        valid, checked_in = [], []
+        for token, is_checked_in in self.env.cr.fetchall():
+            digest = self._hash_checkin_token(token)
+            valid.append(digest)
+            if is_checked_in:
+                checked_in.append(digest)
+        return {
+            'event_id': event.id,
+            'generated_at': fields.Datetime.to_string(fields.Datetime.now()),
+            'hash_bytes': SCANNER_HASH_BYTES,
+            'tokens': base64.b64encode(b''.join(sorted(valid))).decode(),
+            'checked_in': base64.b64encode(b''.join(sorted(checked_in))).decode(),
+        }
+
+    @api.model
+    @instrumented('application.scanner_checkins')
+    def _apply_scanner_checkins(self, event, scans):
+        """Apply check-ins queued by an offline scanner in one transaction.
+
+        :param scans: list of ``{'token': str, 'scanned_at': str}`` dicts
+        :return: dict mapping each token to ``checked_in``, ``duplicate``
+            (already checked in, the earliest scan time is kept) or
+            ``unknown`` (including the badges that are not valid at the
+            gate, like in the manifest)
+        """
+        scanned = {}
+        for scan in scans:
+            token = scan.get('token')
+            if not token:
+                continue
+            scanned_at = fields.Datetime.to_datetime(scan.get('scanned_at')) or fields.Datetime.now()
+            if token not in scanned or scanned_at < scanned[token]:
+                scanned[token] = scanned_at
+        results = dict.fromkeys(scanned, 'unknown')
+        if not scanned:
+            return results
+        apps = self.search([
+            ('event_id', '=', event.id),
+            ('portal_token', 'in', list(scanned)),
+            ('state', 'in', SCANNER_STATES),
+        ])
+        new_apps = apps.filtered(lambda a: a.state != 'checked_in')
+        for app in apps - new_apps:
+            results[app.portal_token] = 'duplicate'
+            if app.checkin_time and scanned[app.portal_token] < app.checkin_time:
+                app.checkin_time = scanned[app.portal_token]
+        if new_apps:
+            self.env.flush_all()
+            self.env.cr.execute("""
+                UPDATE food_vendor_application a
+                   SET state = 'checked_in', checkin_time = v.scanned_at,
+                       checkin_logged = false,
+                       write_uid = %s, write_date = (now() at time zone 'UTC')
+                  FROM unnest(%s::int[], %s::timestamp[]) AS v(app_id, scanned_at)
+                 WHERE a.id = v.app_id
+            """, [
+                self.env.uid,
+                new_apps.ids,
+                [scanned[app.portal_token] for app in new_apps],
+            ])
+            new_apps.invalidate_recordset(['state', 'checkin_time', 'checkin_logged', 'write_uid', 'write_date'])
+            new_apps.modified(['state', 'checkin_time'])
+            self.env['food.festival.kpi']._mark_events_dirty([event.id])
+            for app in new_apps:
+                results[app.portal_token] = 'checked_in'
+        return results
+
+    @api.model
+    def _cron_log_checkins(self):
+        """Post the chatter messages of check-ins recorded at the gate."""
+        apps = self.search([('checkin_logged', '=', False)])
+        if apps._is_quiet_batch():
+            apps._post_digest(_('Vendors checked in at the gate.'))
+        else:
+            for app in apps:
+                app.message_post(body=_('Vendor checked in at %s') % app.checkin_time)
+        apps.checkin_logged = True
+
     # QR code / token logic
     def get_checkin_url(self):
         self.ensure_one()
@@ -288,3 +1308,31 @@ class FoodVendorApplication(models.Model):
         if not self.portal_token:
             self.portal_token = secrets.token_urlsafe(16)
         return f"{base_url}/food/checkin/{self.portal_token}"
+
+    def action_print_badge_sheets(self):
+        """Print the badges of the selection, several per sheet."""
+        return self.env['report.food_truck_festival.report_badge_sheet'].action_print_sheets(self)
+
+    def _prepare_badge_assets(self):
+        """Generate the missing check-in tokens and QR images of ``self``.
+
+        Tokens are assigned with one update for the whole recordset and
+        QR images are rendered only for badges that have none yet, so
+        reprinting reuses the cached assets and rendering the badges
+        never writes to the database.
+        """
+        missing = self.filtered(lambda a: not a.portal_token)
+        if missing:
+            missing.flush_recordset(['portal_token'])
+            self.env.cr.execute("""
+                UPDATE food_vendor_application a
+                   SET portal_token = v.token
+                  FROM unnest(%s::int[], %s::varchar[]) AS v(app_id, token)
+                 WHERE a.id = v.app_id AND a.portal_token IS NULL
+            """, [missing.ids, [secrets.token_urlsafe(16) for _app in missing]])
+            missing.invalidate_recordset(['portal_token'])
+        base_url = self.env['ir.config_parameter'].sudo().get_param('web.base.url')
+        Report = self.env['ir.actions.report']
+        for app in self.filtered(lambda a: not a.checkin_qr):
+            url = f"{base_url}/food/checkin/{app.portal_token}"
+            app.checkin_qr = base64.b64encode(Report.barcode('QR', url, width=300, height=300))
@@ -1,12 +1,229 @@
+/** @odoo-module **/
 /**
  * Custom JavaScript for the Food Truck Festival portal pages.
  *
- * At this time no interactive behaviour is required; this file is
- * included for future enhancements (e.g. dynamic map display or QR
- * code previews).  It remains empty to avoid errors when loaded.
+ * Gate scanner: downloads the check-in manifest of an event (sorted,
+ * truncated sha256 digests of the badge tokens), validates scans
+ * locally so that the gate keeps working without connectivity, and
+ * uploads the queued check-ins in batches whenever the network allows.
  */
 
-odoo.define('food_truck_festival.portal', function (require) {
-    'use strict';
-    // Placeholder module
-});
\ No newline at end of file
+import publicWidget from "@web/legacy/js/public/public_widget";
+import { rpc } from "@web/core/network/rpc";
+
+const SYNC_INTERVAL = 15000;
+const SYNC_BATCH_SIZE = 200;
+
+function base64ToBytes(data) {
+    const binary = atob(data || "");
+    const bytes = new Uint8Array(binary.length);
+    for (let i = 0; i < binary.length; i++) {
+        bytes[i] = binary.charCodeAt(i);
+    }
+    return bytes;
+}
+
+/**
+ * Binary search of a digest in a packed array of sorted digests.
+ */
+function containsDigest(packed, digest, size) {
+    let low = 0;
+    let high = packed.length / size - 1;
+    while (low <= high) {
+        const mid = (low + high) >> 1;
+        let cmp = 0;
+        for (let i = 0; i < size && cmp === 0; i++) {
+            cmp = packed[mid * size + i] - digest[i];
+        }
+        if (cmp === 0) {
+            return true;
+        }
+        if (cmp < 0) {
+            low = mid + 1;
+        } else {
+            high = mid - 1;
+        }
+    }
+    return false;
+}
+
+/**
+ * Extract the token from a scanned check-in URL or raw badge code.
+ */
+function extractToken(code) {
+    const value = (code || "").trim();
+    const match = value.match(/\/food\/checkin\/([^/?#]+)/);
+    return match ? decodeURIComponent(match[1]) : value;
+}
+
+publicWidget.registry.FoodGateScanner = publicWidget.Widget.extend({
+    selector: ".o_food_gate_scanner",
+    events: {
+        "keydown .o_food_scanner_input": "_onInputKeydown",
+        "click .o_food_scanner_camera": "_onCameraClick",
+    },
+
+    async start() {
+        this.eventId = parseInt(this.el.dataset.eventId);
+        this.storageKey = `food_scanner_${this.eventId}`;
+        this.queue = JSON.parse(localStorage.getItem(`${this.storageKey}_queue`) || "[]");
+        this.seen = new Set(this.queue.map((scan) => scan.token));
+        this._onOnline = () => this._sync();
+        window.addEventListener("online", this._onOnline);
+        this.syncTimer = setInterval(() => this._sync(), SYNC_INTERVAL);
+        await this._loadManifest();
+        this._updatePending();
+        this._sync();
+        return this._super(...arguments);
+    },
+
+    destroy() {
+        clearInterval(this.syncTimer);
+        window.removeEventListener("online", this._onOnline);
+        if (this.stream) {
+            this.stream.getTracks().forEach((track) => track.stop());
+        }
+        this._super(...arguments);
+    },
+
+    //--------------------------------------------------------------------------
+    // Manifest and validation
+    //--------------------------------------------------------------------------
+
+    async _loadManifest() {
+        let manifest;
+        try {
+            const response = await fetch(`/food/scanner/${this.eventId}/manifest`, {
+                credentials: "same-origin",
+            });
+            if (!response.ok) {
+                throw new Error(response.statusText);
+            }
+            manifest = await response.json();
+            localStorage.setItem(`${this.storageKey}_manifest`, JSON.stringify(manifest));
+        } catch {
+            manifest = JSON.parse(localStorage.getItem(`${this.storageKey}_manifest`) || "null");
+        }
+        if (!manifest) {
+            this._setStatus("No manifest available; connect to the network once.", true);
+            return;
+        }
+        this.hashBytes = manifest.hash_bytes;
+        this.tokens = base64ToBytes(manifest.tokens);
+        this.checkedIn = base64ToBytes(manifest.checked_in);
+        this._setStatus(
+            `${this.tokens.length / this.hashBytes} badges loaded (manifest of ${manifest.generated_at} UTC).`
+        );
+    },
+
+    async _digest(token) {
+        const buffer = await crypto.subtle.digest("SHA-256", new TextEncoder().encode(token));
+        return new Uint8Array(buffer, 0, this.hashBytes);
+    },
+
+    async _processCode(code) {
+        const token = extractToken(code);
+        if (!token || !this.tokens) {
+            return;
+        }
+        const digest = await this._digest(token);
+        if (!containsDigest(this.tokens, digest, this.hashBytes)) {
+            this._showResult("Unknown badge", "danger");
+            return;
+        }
+        if (this.seen.has(token) || containsDigest(this.checkedIn, digest, this.hashBytes)) {
+            this._showResult("Already checked in", "warning");
+            return;
+        }
+        this.seen.add(token);
+        this.queue.push({ token, scanned_at: new Date().toISOString().slice(0, 19).replace("T", " ") });
+        this._saveQueue();
+        this._showResult("Checked in", "success");
+        if (this.queue.length >= SYNC_BATCH_SIZE) {
+            this._sync();
+        }
+    },
+
+    //--------------------------------------------------------------------------
+    // Synchronisation
+    //--------------------------------------------------------------------------
+
+    async _sync() {
+        if (this.syncing || !this.queue.length || !navigator.onLine) {
+            return;
+        }
+        this.syncing = true;
+        const batch = this.queue.slice(0, SYNC_BATCH_SIZE);
+        try {
+            await rpc(`/food/scanner/${this.eventId}/sync`, { scans: batch });
+            this.queue = this.queue.slice(batch.length);
+            this._saveQueue();
+        } catch {
+            // keep the queue; it is retried on the next interval
+        } finally {
+            this.syncing = false;
+        }
+    },
+
+    _saveQueue() {
+        localStorage.setItem(`${this.storageKey}_queue`, JSON.stringify(this.queue));
+        this._updatePending();
+    },
+
+    //--------------------------------------------------------------------------
+    // UI
+    //--------------------------------------------------------------------------
+
+    _setStatus(message, isError) {
+        const status = this.el.querySelector(".o_food_scanner_status");
+        status.textContent = message;
+        status.classList.toggle("text-danger", !!isError);
+    },
+
+    _showResult(message, level) {
+        const result = this.el.querySelector(".o_food_scanner_result");
+        result.textContent = message;
+        result.className = `o_food_scanner_result alert alert-${level}`;
+    },
+
+    _updatePending() {
+        this.el.querySelector(".o_food_scanner_pending").textContent = this.queue.length;
+    },
+
+    _onInputKeydown(ev) {
+        if (ev.key !== "Enter") {
+            return;
+        }
+        ev.preventDefault();
+        const code = ev.currentTarget.value;
+        ev.currentTarget.value = "";
+        this._processCode(code);
+    },
+
+    async _onCameraClick() {
+        if (this.stream || !("BarcodeDetector" in window)) {
+            return;
+        }
+        const video = this.el.querySelector(".o_food_scanner_video");
+        this.stream = await navigator.mediaDevices.getUserMedia({ video: { facingMode: "environment" } });
+        video.srcObject = this.stream;
+        video.classList.remove("d-none");
+        await video.play();
+        const detector = new window.BarcodeDetector({ formats: ["qr_code"] });
+        let lastCode = null;
+        const detect = async () => {
+            if (!this.stream) {
+                return;
+            }
+            const codes = await detector.detect(video);
+            if (codes.length && codes[0].rawValue !== lastCode) {
+                lastCode = codes[0].rawValue;
+                await this._processCode(lastCode);
+            }
+            requestAnimationFrame(detect);
+        };
+        detect();
+    },
+});
+
+export default publicWidget.registry.FoodGateScanner;
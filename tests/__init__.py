@@ -0,0 +1,11 @@
+"""
+Test suites of the food_truck_festival module.
+
+``test_flow`` and ``test_metrics`` run with the regular post-install
+tests.  The synthetic load benchmarks of ``test_performance`` are tagged
+``food_perf`` and only run when selected explicitly.
+"""
+
+from . import test_flow
+from . import test_metrics
+from . import test_performance
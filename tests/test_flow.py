@@ -7,8 +7,12 @@ approved, a contract is signed, and an invoice is generated.  They
 also verify security restrictions for portal users.
 """
 
+from odoo import api
+from odoo.exceptions import UserError
 from odoo.tests import SavepointCase, tagged
 
+from ..models.application_transfer import csv_stream
+
 
 @tagged('-at_install', 'post_install')
 class TestFoodFestivalFlow(SavepointCase):
@@ -61,6 +65,503 @@ class TestFoodFestivalFlow(SavepointCase):
         self.assertEqual(app.state, 'invoiced')
         self.assertTrue(app.sale_order_id)
         self.assertTrue(app.invoice_id)
+        # the booth line uses the shared booth product of the event
+        self.assertEqual(app.sale_order_id.order_line.product_id, self.event.food_booth_product_id)
         # check‑in
         app.action_check_in()
-        self.assertEqual(app.state, 'checked_in')
\ No newline at end of file
+        self.assertEqual(app.state, 'checked_in')
+
+    def test_booth_allocation_best_fit(self):
+        # a well-equipped booth should be kept for the truck needing water
+        big_booth = self.env['food.booth'].create({
+            'name': 'Big Booth',
+            'event_id': self.event.id,
+            'code': 'B1',
+            'width_m': 6,
+            'depth_m': 4,
+            'power_kw': 10,
+            'water': True,
+            'price_per_day': 200,
+        })
+        small_app = self.env['food.vendor.application'].create({
+            'partner_id': self.vendor.id,
+            'event_id': self.event.id,
+            'needs_power_kw': 1,
+            'truck_width': 2,
+            'truck_depth': 2,
+        })
+        water_app = self.env['food.vendor.application'].create({
+            'partner_id': self.vendor.id,
+            'event_id': self.event.id,
+            'needs_power_kw': 5,
+            'needs_water': True,
+            'truck_width': 5,
+            'truck_depth': 3,
+        })
+        apps = small_app | water_app
+        preview = apps.allocate_booths(dry_run=True)
+        self.assertEqual(len(preview['assignments']), 2)
+        self.assertFalse(apps.booth_id)
+        apps.allocate_booths()
+        self.assertEqual(small_app.booth_id, self.booth)
+        self.assertEqual(water_app.booth_id, big_booth)
+        self.assertEqual(big_booth.state, 'reserved')
+        self.assertEqual(big_booth.application_id, water_app)
+        self.assertEqual(water_app.computed_subtotal, 200)
+
+    def test_checkin_by_token_idempotent(self):
+        app = self.env['food.vendor.application'].create({
+            'partner_id': self.vendor.id,
+            'event_id': self.event.id,
+            'state': 'invoiced',
+            'portal_token': 'test-token',
+        })
+        Application = self.env['food.vendor.application']
+        found, checked_in = Application._checkin_by_token('test-token')
+        self.assertEqual(found, app)
+        self.assertTrue(checked_in)
+        self.assertEqual(app.state, 'checked_in')
+        self.assertFalse(app.checkin_logged)
+        _found, checked_in = Application._checkin_by_token('test-token')
+        self.assertFalse(checked_in)
+        self.assertFalse(Application._checkin_by_token('unknown-token')[0])
+        Application._cron_log_checkins()
+        self.assertTrue(app.checkin_logged)
+
+    def test_checkin_by_token_rejected(self):
+        app = self.env['food.vendor.application'].create({
+            'partner_id': self.vendor.id,
+            'event_id': self.event.id,
+            'state': 'rejected',
+            'portal_token': 'rejected-token',
+        })
+        found, checked_in = self.env['food.vendor.application']._checkin_by_token('rejected-token')
+        self.assertEqual(found, app)
+        self.assertFalse(checked_in)
+        self.assertEqual(app.state, 'rejected')
+        self.assertFalse(app.checkin_time)
+
+    def test_bulk_festival_setup(self):
+        event = self.env['event.event'].create({
+            'name': 'Setup Festival',
+            'date_begin': '2025-09-05 10:00:00',
+            'date_end': '2025-09-07 22:00:00',
+            'date_tz': 'UTC',
+        })
+        days = event.action_generate_food_days()
+        self.assertEqual(len(days), 3)
+        self.assertFalse(event.action_generate_food_days())
+        layout = (
+            'code,width_m,depth_m,power_kw,water,price_per_day,x_coord,y_coord\n'
+            'C1,3,3,2,yes,80,10,10\n'
+            'C2,4,3,6,no,120,20,10\n'
+        )
+        booths = event._import_food_booths(layout.encode(), 'csv')
+        self.assertEqual(booths.mapped('code'), ['C1', 'C2'])
+        self.assertEqual(booths[1].area_sqm, 12)
+        self.assertTrue(booths[0].water)
+        with self.assertRaises(UserError):
+            event._import_food_booths('code,width_m\nC1,3\n,2\n', 'csv')
+
+    def test_booth_shared_on_disjoint_days(self):
+        Application = self.env['food.vendor.application']
+        saturday = Application.create({
+            'partner_id': self.vendor.id,
+            'event_id': self.event.id,
+            'needs_power_kw': 1,
+            'day_ids': [(6, 0, [self.day1.id])],
+        })
+        sunday = Application.create({
+            'partner_id': self.vendor.id,
+            'event_id': self.event.id,
+            'needs_power_kw': 1,
+            'day_ids': [(6, 0, [self.day2.id])],
+        })
+        saturday.allocate_booths()
+        self.assertEqual(saturday.booth_id, self.booth)
+        self.assertEqual(self.booth.state, 'available')
+        self.assertFalse(self.booth.is_free_on(saturday.day_mask))
+        self.assertTrue(self.booth.is_free_on(sunday.day_mask))
+        sunday.allocate_booths()
+        self.assertEqual(sunday.booth_id, self.booth)
+        self.assertEqual(self.booth.occupancy_mask, self.event.food_day_mask)
+        self.assertEqual(self.booth.state, 'reserved')
+
+    def test_booth_shared_in_one_allocation(self):
+        # both reservations of the booth are written by one batch update
+        apps = self.env['food.vendor.application'].create([{
+            'partner_id': self.vendor.id,
+            'event_id': self.event.id,
+            'needs_power_kw': 1,
+            'day_ids': [(6, 0, [day.id])],
+        } for day in (self.day1, self.day2)])
+        result = apps.allocate_booths()
+        self.assertEqual(len(result['assignments']), 2)
+        self.assertEqual(apps.booth_id, self.booth)
+        self.assertEqual(self.booth.occupancy_mask, self.event.food_day_mask)
+        self.assertEqual(self.booth.state, 'reserved')
+
+    def test_booth_spatial_queries(self):
+        Booth = self.env['food.booth']
+        near, mid, far = Booth.create([{
+            'name': code,
+            'event_id': self.event.id,
+            'code': code,
+            'power_kw': power,
+            'x_coord': x,
+            'y_coord': y,
+        } for code, power, x, y in (('S1', 2, 10, 10), ('S2', 4, 20, 10), ('S3', 8, 50, 50))])
+        # the test booth sits at the origin of the map
+        self.assertEqual(Booth.search_nearest(self.event, 12, 10, count=2), near | mid)
+        self.assertEqual(Booth.search_within(self.event, 12, 10, 9), near | mid)
+        summary = Booth.get_zone_summary(self.event, 5, 5, 25, 15)
+        self.assertEqual(sorted(summary['booth_ids']), sorted((near | mid).ids))
+        self.assertEqual(summary['count'], 2)
+        self.assertEqual(summary['power_kw'], 6)
+        # a moved booth is found at its new place by the same transaction
+        far.write({'x_coord': 12, 'y_coord': 11})
+        self.assertEqual(Booth.search_nearest(self.event, 12, 11), far)
+        self.assertEqual(Booth.get_zone_summary(self.event, 5, 5, 25, 15)['power_kw'], 14)
+
+    def test_bulk_transitions_skip_invalid(self):
+        Application = self.env['food.vendor.application']
+        apps = Application.create([{
+            'partner_id': self.vendor.id,
+            'event_id': self.event.id,
+            'needs_power_kw': 1,
+        } for _index in range(3)])
+        apps[2].state = 'rejected'
+        done, failures = apps._bulk_transition('review')
+        self.assertEqual(done, apps[:2])
+        self.assertEqual(list(failures), [apps[2]])
+        # a single booth: one approval succeeds, the other is reported
+        done, failures = apps[:2]._bulk_transition('approved')
+        self.assertEqual(len(done), 1)
+        self.assertEqual(done.state, 'approved')
+        self.assertTrue(done.portal_token)
+        self.assertEqual(len(failures), 1)
+        self.assertEqual(list(failures)[0].state, 'review')
+
+    def test_quiet_bulk_mode_posts_digest(self):
+        apps = self.env['food.vendor.application'].create([{
+            'partner_id': self.vendor.id,
+            'event_id': self.event.id,
+        } for _index in range(2)])
+        Message = self.env['mail.message']
+        app_messages = Message.search_count([('model', '=', apps._name), ('res_id', 'in', apps.ids)])
+        event_messages = Message.search_count([('model', '=', 'event.event'), ('res_id', '=', self.event.id)])
+        apps.with_context(food_digest=True).action_submit()
+        self.assertEqual(set(apps.mapped('state')), {'review'})
+        # no tracking on the applications, a single note on the event
+        self.assertEqual(
+            Message.search_count([('model', '=', apps._name), ('res_id', 'in', apps.ids)]), app_messages)
+        self.assertEqual(
+            Message.search_count([('model', '=', 'event.event'), ('res_id', '=', self.event.id)]), event_messages + 1)
+
+    def test_returning_vendor_matched_on_submit(self):
+        self.vendor.write({'vat': 'RO 123 456', 'email': 'Chef@Example.com'})
+        Application = self.env['food.vendor.application']
+        apps = Application.create([{
+            'event_id': self.event.id,
+            'company_name_fallback': 'Vendor Test',
+            'vat_fallback': 'ro123456',
+        }, {
+            'event_id': self.event.id,
+            'company_name_fallback': 'Vendor Test',
+            'email_fallback': 'chef@example.com',
+        }, {
+            'event_id': self.event.id,
+            'company_name_fallback': 'New Truck',
+            'email_fallback': 'new@example.com',
+        }, {
+            'event_id': self.event.id,
+            'company_name_fallback': 'New Truck',
+            'email_fallback': 'NEW@example.com',
+        }])
+        apps.action_submit()
+        self.assertEqual(apps[0].partner_id, self.vendor)
+        self.assertEqual(apps[1].partner_id, self.vendor)
+        self.assertNotEqual(apps[2].partner_id, self.vendor)
+        self.assertEqual(apps[3].partner_id, apps[2].partner_id)
+
+    def test_totals_match_uncached_taxes(self):
+        tax = self.env['account.tax'].create({
+            'name': 'Festival VAT',
+            'amount_type': 'percent',
+            'amount': 10,
+            'type_tax_use': 'sale',
+            'company_id': self.company.id,
+        })
+        self.event._get_food_booth_product().taxes_id = tax
+        # the first two applications share one cached tax evaluation
+        apps = self.env['food.vendor.application'].create([{
+            'partner_id': self.vendor.id,
+            'event_id': self.event.id,
+            'booth_id': self.booth.id,
+            'day_ids': [(6, 0, days.ids)],
+        } for days in (self.day1 + self.day2, self.day1 + self.day2, self.day1)])
+
+        def assert_uncached_totals():
+            for app in apps:
+                res = tax.compute_all(
+                    self.booth.price_per_day, currency=app.currency_id,
+                    quantity=len(app.day_ids), partner=self.vendor,
+                )
+                self.assertAlmostEqual(app.computed_subtotal, res['total_excluded'])
+                self.assertAlmostEqual(app.computed_total, res['total_included'])
+                self.assertAlmostEqual(app.taxes, res['total_included'] - res['total_excluded'])
+
+        assert_uncached_totals()
+        self.assertAlmostEqual(apps[0].computed_total, 220)
+        tax.amount = 20
+        assert_uncached_totals()
+        self.assertAlmostEqual(apps[0].computed_total, 240)
+        self.booth.price_per_day = 150
+        assert_uncached_totals()
+        self.assertAlmostEqual(apps[2].computed_total, 180)
+
+    def _patch_contract_dispatch(self, broken=None):
+        """Count sign request creations, failing those of ``broken``, and skip the emails."""
+        SignRequest = self.env['sign.request']
+        sign_request_create = type(SignRequest).create
+        batches = []
+
+        @api.model_create_multi
+        def create(requests, vals_list):
+            batches.append(len(vals_list))
+            if broken and any(vals['reference'] == broken.name for vals in vals_list):
+                raise UserError('Broken contract')
+            return sign_request_create(requests, vals_list)
+
+        self.patch(type(SignRequest), 'create', create)
+        self.patch(type(SignRequest), 'action_sent', lambda requests: True)
+        return batches
+
+    def test_contract_dispatch_batch(self):
+        apps = self.env['food.vendor.application'].create([{
+            'partner_id': self.vendor.id,
+            'event_id': self.event.id,
+            'state': 'approved',
+        } for _index in range(3)])
+        batches = self._patch_contract_dispatch()
+        apps.action_send_contract()
+        self.assertEqual(set(apps.mapped('contract_dispatch_state')), {'queued'})
+        self.env['food.vendor.application']._cron_dispatch_contracts()
+        self.assertEqual(batches, [3])
+        self.assertEqual(set(apps.mapped('state')), {'contract_sent'})
+        self.assertEqual(set(apps.mapped('contract_dispatch_state')), {'sent'})
+        self.assertEqual(len(apps.sign_request_id), 3)
+        self.assertEqual(apps.sign_request_id.mapped('reference'), apps.mapped('name'))
+
+    def test_contract_dispatch_isolates_failures(self):
+        Application = self.env['food.vendor.application']
+        apps = Application.create([{
+            'partner_id': self.vendor.id,
+            'event_id': self.event.id,
+            'state': 'approved',
+        } for _index in range(3)])
+        broken = apps[1]
+        batches = self._patch_contract_dispatch(broken)
+        apps.action_send_contract()
+        Application._cron_dispatch_contracts()
+        # the batch fails, then every application is tried on its own
+        self.assertEqual(batches, [3, 1, 1, 1])
+        self.assertEqual((apps - broken).mapped('state'), ['contract_sent', 'contract_sent'])
+        self.assertEqual(broken.state, 'approved')
+        self.assertFalse(broken.sign_request_id)
+        self.assertEqual(broken.contract_dispatch_state, 'queued')
+        self.assertEqual(broken.contract_dispatch_attempts, 1)
+        self.assertEqual(broken.contract_dispatch_error, 'Broken contract')
+        # retried on the next runs until out of attempts
+        Application._cron_dispatch_contracts()
+        Application._cron_dispatch_contracts()
+        self.assertEqual(broken.contract_dispatch_attempts, 3)
+        self.assertEqual(broken.contract_dispatch_state, 'failed')
+        Application._cron_dispatch_contracts()
+        self.assertEqual(broken.contract_dispatch_attempts, 3)
+        self.assertEqual(len((apps - broken).sign_request_id), 2)
+
+    def test_sign_completion_signs_application_once(self):
+        Application = self.env['food.vendor.application']
+        app = Application.create({
+            'partner_id': self.vendor.id,
+            'event_id': self.event.id,
+            'state': 'approved',
+        })
+        template = self.env.ref('food_truck_festival.sign_template_vendor_contract')
+        self.patch(type(self.env['sign.request']), 'action_sent', lambda requests: True)
+        sign_request = self.env['sign.request'].create(app._prepare_sign_request_vals(template))
+        app.write({'sign_request_id': sign_request.id, 'state': 'contract_sent'})
+        write_workflow_state = type(Application)._write_workflow_state
+        transitions = []
+
+        def _write_workflow_state(apps, vals, message=None):
+            transitions.append((apps, vals))
+            return write_workflow_state(apps, vals, message=message)
+
+        self.patch(type(Application), '_write_workflow_state', _write_workflow_state)
+        sign_request.write({'state': 'signed'})
+        self.assertEqual(app.state, 'signed')
+        self.assertEqual(transitions, [(app, {'state': 'signed'})])
+        # writing the completed state again does not move the application
+        sign_request.write({'state': 'signed'})
+        self.assertEqual(len(transitions), 1)
+        messages = app.message_ids.filtered(lambda message: 'Contract signed.' in (message.body or ''))
+        self.assertEqual(len(messages), 1)
+
+    def test_kpi_rows(self):
+        booth2 = self.booth.copy({'code': 'T2', 'name': 'Test Booth 2'})
+        apps = self.env['food.vendor.application'].create([{
+            'partner_id': self.vendor.id,
+            'event_id': self.event.id,
+            'booth_id': booth.id,
+            'day_ids': [(6, 0, days.ids)],
+            'state': state,
+            'pricing_package': package,
+        } for booth, days, state, package in (
+            (self.booth, self.day1 + self.day2, 'checked_in', 'basic'),
+            (booth2, self.day1, 'signed', 'standard'),
+            (self.env['food.booth'], self.day2, 'rejected', 'premium'),
+            (self.env['food.booth'], self.day2, 'review', 'basic'),
+        )])
+        both_days, saturday = apps[:2]
+        self.assertTrue(both_days.computed_total and saturday.computed_total)
+        Kpi = self.env['food.festival.kpi']
+        Kpi._mark_events_dirty(self.event.ids)
+        self.env.flush_all()
+        self.env.cr.precommit.run()
+        Kpi._cron_refresh_dirty_events()
+        rows = {row.day_id: row for row in Kpi.search([('event_id', '=', self.event.id)])}
+        self.assertEqual(set(rows), {self.env['food.event.day'], self.day1, self.day2})
+        expected = {
+            # day: (occupancy, applications, approved, check-in rate, basic, standard)
+            self.env['food.event.day']: (100, 3, 2, 50, both_days.computed_total, saturday.computed_total),
+            self.day1: (100, 2, 2, 50, both_days.computed_total / 2, saturday.computed_total),
+            self.day2: (50, 2, 1, 100, both_days.computed_total / 2, 0),
+        }
+        for day, (occupancy, count, approved, checkin_rate, basic, standard) in expected.items():
+            row = rows[day]
+            self.assertEqual(row.booths_total, 2)
+            self.assertAlmostEqual(row.occupancy_rate, occupancy)
+            self.assertEqual(row.applications_count, count)
+            self.assertEqual(row.approved_count, approved)
+            self.assertEqual(row.checked_in_count, 1)
+            self.assertAlmostEqual(row.checkin_rate, checkin_rate)
+            self.assertAlmostEqual(row.revenue_basic, basic, places=2)
+            self.assertAlmostEqual(row.revenue_standard, standard, places=2)
+            self.assertAlmostEqual(row.revenue_premium, 0)
+            self.assertAlmostEqual(row.revenue_total, basic + standard, places=2)
+
+    def test_invoicing_cron_isolates_failures(self):
+        Application = self.env['food.vendor.application']
+        apps = Application.create([{
+            'partner_id': self.vendor.id,
+            'event_id': self.event.id,
+            'state': 'signed',
+        } for _index in range(3)])
+        broken = apps[1]
+        prepare_invoice_vals = type(Application)._prepare_invoice_vals
+
+        def _prepare_invoice_vals(app, order):
+            if app == broken:
+                raise UserError('Broken invoice')
+            return prepare_invoice_vals(app, order)
+
+        self.patch(type(Application), '_prepare_invoice_vals', _prepare_invoice_vals)
+        Application._cron_invoice_signed_applications()
+        self.assertEqual((apps - broken).mapped('state'), ['invoiced', 'invoiced'])
+        self.assertEqual(broken.state, 'signed')
+        self.assertEqual(broken.invoice_error, 'Broken invoice')
+        # flagged applications wait for a manual retry
+        Application._cron_invoice_signed_applications()
+        self.assertEqual(broken.invoice_error, 'Broken invoice')
+        broken.action_retry_invoicing()
+        self.assertFalse(broken.invoice_error)
+
+    def test_reserve_application_numbers(self):
+        Application = self.env['food.vendor.application']
+        numbers = Application._reserve_application_numbers(3)
+        self.assertEqual(len(set(numbers)), 3)
+        app = Application.create({'partner_id': self.vendor.id, 'event_id': self.event.id})
+        self.assertNotIn(app.name, numbers)
+
+    def test_intake_accepts_trucks_and_drops_resubmissions(self):
+        Intake = self.env['food.application.intake']
+        values = {
+            'event_id': self.event.id,
+            'company_name_fallback': 'Caterer',
+            'email_fallback': 'caterer@example.com',
+            'truck_width': 3.0,
+        }
+        first = Intake._enqueue(values, 'form-1')
+        resent = Intake._enqueue(values, 'form-1')
+        # other trucks of the same caterer, from another form or without id
+        second_truck = Intake._enqueue(dict(values, truck_width=4.0), 'form-2')
+        third_truck = Intake._enqueue(dict(values, truck_width=5.0))
+        Intake._cron_process_intake()
+        self.assertEqual((first | second_truck | third_truck).mapped('state'), ['done'] * 3)
+        self.assertEqual(resent.state, 'duplicate')
+        self.assertEqual(len((first | second_truck | third_truck).application_id), 3)
+        # the same form posted again in a later batch
+        again = Intake._enqueue(values, 'form-1')
+        Intake._cron_process_intake()
+        self.assertEqual(again.state, 'duplicate')
+
+    def test_intake_failures_isolated_and_retried(self):
+        Intake = self.env['food.application.intake']
+        good = Intake._enqueue({'event_id': self.event.id, 'company_name_fallback': 'Good Truck'}, 'good')
+        bad = Intake._enqueue({'event_id': self.event.id, 'truck_width': 'wide'}, 'bad')
+        Intake._cron_process_intake()
+        self.assertEqual(good.state, 'done')
+        self.assertTrue(good.application_id)
+        self.assertEqual(bad.state, 'error')
+        self.assertEqual(bad.attempts, 1)
+        for _run in range(3):
+            Intake._cron_process_intake()
+        self.assertEqual(bad.attempts, 3)
+
+    def test_archive_food_season(self):
+        app = self.env['food.vendor.application'].create({
+            'partner_id': self.vendor.id,
+            'event_id': self.event.id,
+        })
+        self.event.action_archive_food_season()
+        self.assertTrue(self.event.food_season_archived)
+        self.assertFalse(app.active)
+        self.assertFalse(self.booth.active)
+        self.assertFalse(self.env['food.vendor.application'].search([('event_id', '=', self.event.id)]))
+        self.event.action_unarchive_food_season()
+        self.assertTrue(app.active)
+        self.assertTrue(self.booth.active)
+
+    def test_application_export_import_round_trip(self):
+        self.vendor.email = 'vendor@example.com'
+        service = self.env['product.product'].create({
+            'name': 'Extra Power',
+            'default_code': 'PWR',
+            'type': 'service',
+            'list_price': 25,
+        })
+        Application = self.env['food.vendor.application']
+        Application.create({
+            'partner_id': self.vendor.id,
+            'event_id': self.event.id,
+            'day_ids': [(6, 0, [self.day1.id])],
+            'service_line_ids': [
+                (0, 0, {'product_id': service.id, 'qty': 2, 'price_unit': 25}),
+                (0, 0, {'product_id': service.id, 'qty': 1, 'price_unit': 30}),
+            ],
+        })
+        rows = list(Application._export_rows([('event_id', '=', self.event.id)]))
+        self.assertEqual(len(rows), 3)
+        self.assertEqual(rows[2][:3], ['', '', ''])
+        content = b''.join(csv_stream(rows))
+        imported = Application._import_applications(self.event, content, 'csv')
+        self.assertEqual(len(imported), 1)
+        # a fresh number, never the one of the exported application
+        self.assertNotEqual(imported.name, rows[1][0])
+        self.assertEqual(imported.state, 'new')
+        self.assertEqual(imported.partner_id, self.vendor)
+        self.assertEqual(imported.day_ids, self.day1)
+        self.assertEqual(imported.service_line_ids.mapped('qty'), [2, 1])
+        self.assertEqual(imported.service_line_ids.mapped('price_unit'), [25, 30])
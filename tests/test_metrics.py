@@ -0,0 +1,48 @@
+"""
+Tests of the instrumentation of the festival hot paths.
+"""
+
+import os
+
+from odoo.tests import TransactionCase, tagged
+
+from ..models.festival_metrics import CALL_METRICS, INSTRUMENTATION_PARAM, Histogram
+
+
+@tagged('-at_install', 'post_install')
+class TestFoodFestivalMetrics(TransactionCase):
+    def setUp(self):
+        super().setUp()
+        CALL_METRICS.reset()
+        self.addCleanup(CALL_METRICS.reset)
+        self.event = self.env['event.event'].create({
+            'name': 'Metrics Festival',
+            'date_begin': '2025-08-01 10:00:00',
+            'date_end': '2025-08-01 22:00:00',
+        })
+        self.app = self.env['food.vendor.application'].create({
+            'event_id': self.event.id,
+            'company_name_fallback': 'Metrics Truck',
+        })
+
+    def test_histogram_is_cumulative(self):
+        histogram = Histogram((1, 5, float('inf')))
+        for value in (0.5, 3, 3, 10):
+            histogram.observe(value)
+        self.assertEqual(list(histogram.samples()), [(1, 1), (5, 3), (float('inf'), 4)])
+        self.assertEqual(histogram.count, 4)
+        self.assertEqual(histogram.total, 16.5)
+
+    def test_instrumentation_disabled_by_default(self):
+        self.app.action_reject()
+        self.assertNotIn('application.reject', CALL_METRICS.render(self.env.cr.dbname))
+
+    def test_instrumented_call_rendered_per_worker(self):
+        self.env['ir.config_parameter'].sudo().set_param(INSTRUMENTATION_PARAM, '1')
+        self.app.action_reject()
+        output = CALL_METRICS.render(self.env.cr.dbname)
+        labels = 'call="application.reject",worker="%d"' % os.getpid()
+        self.assertIn('food_call_duration_seconds_count{%s} 1' % labels, output)
+        self.assertIn('food_call_errors_total{%s} 0' % labels, output)
+        # other databases of the server are not exported
+        self.assertNotIn('application.reject', CALL_METRICS.render('other_database'))
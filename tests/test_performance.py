@@ -0,0 +1,217 @@
+"""
+Synthetic load benchmarks for the Food Truck Festival module.
+
+A multi-day festival with thousands of applications and booths is
+generated once per class.  Every workflow step is then measured for
+wall time and number of SQL queries, checked against the budgets below
+and collected into a JSON report that can be compared across releases.
+
+These tests are slow and excluded from the default test run; select
+them explicitly::
+
+    odoo-bin -d <db> -i food_truck_festival --test-tags food_perf
+
+The volume is scaled with ``FOOD_PERF_APPLICATIONS`` and
+``FOOD_PERF_BOOTHS``, and the report is written to the file named by
+``FOOD_PERF_REPORT`` (it is logged otherwise).
+"""
+
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+
+import odoo
+from odoo.tests import HttpCase, new_test_user, tagged
+
+from ..models.vendor_application import INVOICE_BATCH_SIZE
+
+_logger = logging.getLogger(__name__)
+
+APPLICATION_COUNT = int(os.environ.get('FOOD_PERF_APPLICATIONS', 5000))
+BOOTH_COUNT = int(os.environ.get('FOOD_PERF_BOOTHS', 1000))
+EVENT_DAYS = 3
+PARTNER_COUNT = 250
+
+# Budgets per benchmark: (fixed queries, queries per record, seconds per
+# record).  They are upper bounds meant to catch queries issued per
+# record where a batch is expected; tighten them from the recorded
+# reports rather than loosening them when a benchmark fails.
+PERF_BUDGETS = {
+    'submit': (20, 0.2, 0.005),
+    'approve': (60, 0.5, 0.05),
+    'allocation_dry_run': (20, 0.05, 0.05),
+    'allocation': (40, 0.2, 0.05),
+    'mark_signed': (150, 3, 0.05),
+    'checkin_token': (5, 5, 0.02),
+    'checkin_batch': (20, 0.1, 0.005),
+    'scanner_sync': (20, 0.1, 0.005),
+    'portal_list': (60, 0, 2.0),
+    'portal_list_json': (60, 0, 2.0),
+    'apply_form_cold': (80, 0, 2.0),
+    'apply_form_warm': (10, 0, 0.5),
+}
+
+
+@tagged('-standard', 'food_perf', '-at_install', 'post_install')
+class TestFoodFestivalPerformance(HttpCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.results = []
+        cls.event = cls.env['event.event'].create({
+            'name': 'Benchmark Festival',
+            'date_begin': '2025-08-01 10:00:00',
+            'date_end': '2025-08-03 22:00:00',
+            'date_tz': 'UTC',
+            'is_published': True,
+        })
+        cls.days = cls.event.action_generate_food_days()
+        cls.booths = cls.env['food.booth'].create([{
+            'name': 'Booth %04d' % index,
+            'event_id': cls.event.id,
+            'code': 'P%04d' % index,
+            'width_m': 4 + index % 3,
+            'depth_m': 3 + index % 2,
+            'power_kw': 4 + index % 8,
+            'water': index % 2 == 0,
+            'sewage': index % 5 == 0,
+            'price_per_day': 80 + index % 4 * 20,
+            'x_coord': index % 40 * 10,
+            'y_coord': index // 40 * 10,
+        } for index in range(BOOTH_COUNT)])
+        cls.portal_user = new_test_user(
+            cls.env, login='food_perf_portal', groups='base.group_portal', name='Benchmark Vendor',
+        )
+        partners = cls.portal_user.partner_id | cls.env['res.partner'].create([{
+            'name': 'Benchmark Vendor %d' % index,
+            'company_type': 'company',
+        } for index in range(PARTNER_COUNT - 1)])
+        # every third application attends a single day, the others all days
+        cls.applications = cls.env['food.vendor.application'].create([{
+            'partner_id': partners[index % PARTNER_COUNT].id,
+            'event_id': cls.event.id,
+            'truck_width': 2 + index % 3,
+            'truck_depth': 2 + index % 2,
+            'needs_power_kw': 1 + index % 4,
+            'needs_water': index % 7 == 0,
+            'day_ids': [(6, 0, cls.days.ids if index % 3 else [cls.days.ids[index // 3 % EVENT_DAYS]])],
+        } for index in range(APPLICATION_COUNT)])
+        cls.env.flush_all()
+
+    @classmethod
+    def tearDownClass(cls):
+        report = json.dumps({
+            'module': 'food_truck_festival',
+            'server_version': odoo.release.version,
+            'applications': APPLICATION_COUNT,
+            'booths': BOOTH_COUNT,
+            'days': EVENT_DAYS,
+            'results': cls.results,
+        }, indent=2)
+        path = os.environ.get('FOOD_PERF_REPORT')
+        if path:
+            with open(path, 'w') as report_file:
+                report_file.write(report)
+        else:
+            _logger.info('Food festival benchmark report:\n%s', report)
+        super().tearDownClass()
+
+    @contextmanager
+    def measure(self, name, count=1):
+        """Measure the queries and wall time of the block, pending writes included."""
+        self.env.flush_all()
+        self.env.invalidate_all()
+        queries = self.env.cr.sql_log_count
+        start = time.perf_counter()
+        yield
+        self.env.flush_all()
+        elapsed = time.perf_counter() - start
+        queries = self.env.cr.sql_log_count - queries
+        self.results.append({
+            'name': name,
+            'records': count,
+            'queries': queries,
+            'seconds': round(elapsed, 4),
+        })
+        fixed, per_query, per_second = PERF_BUDGETS[name]
+        query_budget = fixed + per_query * count
+        self.assertLessEqual(
+            queries, query_budget,
+            '%s issued %d queries for %d records (budget %d)' % (name, queries, count, query_budget))
+        time_budget = 1.0 + per_second * count
+        self.assertLessEqual(
+            elapsed, time_budget,
+            '%s took %.2fs for %d records (budget %.2fs)' % (name, elapsed, count, time_budget))
+
+    def _approved(self):
+        """Submit and approve as many applications as there are booths."""
+        apps = self.applications[:BOOTH_COUNT]
+        apps.action_submit()
+        apps.action_approve()
+        return apps
+
+    def test_workflow(self):
+        apps = self.applications
+        with self.measure('submit', len(apps)):
+            apps.action_submit()
+        self.assertEqual(set(apps.mapped('state')), {'review'})
+
+        approved = apps[:BOOTH_COUNT]
+        with self.measure('approve', len(approved)):
+            approved.action_approve()
+        self.assertTrue(all(approved.mapped('booth_id')))
+
+        pending = apps - approved
+        with self.measure('allocation_dry_run', len(pending)):
+            pending.allocate_booths(dry_run=True)
+
+        # real allocation of the remaining applications, reservations included
+        with self.measure('allocation', len(pending)):
+            result = pending.allocate_booths()
+        self.assertEqual(len(result['assignments']) + len(result['unassigned']), len(pending))
+        self.assertEqual(len(pending.filtered('booth_id')), len(result['assignments']))
+
+        signed = approved[:INVOICE_BATCH_SIZE]
+        with self.measure('mark_signed', len(signed)):
+            signed.action_mark_signed()
+        self.assertEqual(set(signed.mapped('state')), {'invoiced'})
+
+    def test_checkin(self):
+        apps = self._approved()
+        Application = self.env['food.vendor.application']
+        tokens = apps[:100].mapped('portal_token')
+        with self.measure('checkin_token', len(tokens)):
+            for token in tokens:
+                Application._checkin_by_token(token)
+
+        batch = apps[100:BOOTH_COUNT // 2]
+        with self.measure('checkin_batch', len(batch)):
+            batch.action_check_in()
+
+        scans = [
+            {'token': app.portal_token, 'scanned_at': '2025-08-01 09:30:00'}
+            for app in apps[BOOTH_COUNT // 2:]
+        ]
+        with self.measure('scanner_sync', len(scans)):
+            Application._apply_scanner_checkins(self.event, scans)
+        self.assertEqual(set(apps.mapped('state')), {'checked_in'})
+
+    def test_portal_pages(self):
+        self.authenticate('food_perf_portal', 'food_perf_portal')
+        with self.measure('portal_list'):
+            response = self.url_open('/my/food')
+        self.assertEqual(response.status_code, 200)
+        with self.measure('portal_list_json'):
+            response = self.url_open('/my/food/json')
+        self.assertEqual(response.status_code, 200)
+
+    def test_apply_form(self):
+        url = '/food/apply?event_id=%d' % self.event.id
+        with self.measure('apply_form_cold'):
+            response = self.url_open(url)
+        self.assertEqual(response.status_code, 200)
+        with self.measure('apply_form_warm'):
+            response = self.url_open(url)
+        self.assertEqual(response.status_code, 200)
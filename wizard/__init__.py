@@ -0,0 +1,10 @@
+"""
+Wizards of the Food Truck Festival module.
+
+Transient models guiding organisers through bulk operations that do
+not fit on a regular form, such as importing a venue's booth layout.
+"""
+
+from . import food_booth_import
+from . import food_partner_dedup
+from . import food_application_import
@@ -0,0 +1,39 @@
+"""
+Import a legacy vendor list into an event.
+
+The wizard only collects the file; parsing, validation and creation
+are done by ``food.vendor.application._import_applications``, which can
+also be called from scripts and RPC.
+"""
+
+import base64
+
+from odoo import _, fields, models
+
+
+class FoodApplicationImport(models.TransientModel):
+    _name = 'food.application.import'
+    _description = 'Import Food Festival Applications'
+
+    event_id = fields.Many2one('event.event', required=True, ondelete='cascade')
+    file_format = fields.Selection([
+        ('csv', 'CSV'),
+        ('xlsx', 'Excel (XLSX)'),
+    ], required=True, default='csv')
+    data_file = fields.Binary(string='File', required=True)
+    filename = fields.Char()
+
+    def action_import(self):
+        self.ensure_one()
+        applications = self.env['food.vendor.application']._import_applications(
+            self.event_id, base64.b64decode(self.data_file), self.file_format,
+        )
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Application Import'),
+                'message': _('%s applications imported.', len(applications)),
+                'next': {'type': 'ir.actions.act_window_close'},
+            },
+        }
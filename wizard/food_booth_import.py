@@ -0,0 +1,37 @@
+"""
+Import the booth layout of a venue from a CSV or GeoJSON file.
+
+The wizard only collects the file; parsing, validation and creation
+are done by ``event.event._import_food_booths`` so that the same bulk
+setup API can be called from scripts and RPC.
+"""
+
+import base64
+
+from odoo import _, fields, models
+
+
+class FoodBoothImport(models.TransientModel):
+    _name = 'food.booth.import'
+    _description = 'Import Food Festival Booths'
+
+    event_id = fields.Many2one('event.event', required=True, ondelete='cascade')
+    file_format = fields.Selection([
+        ('csv', 'CSV'),
+        ('geojson', 'GeoJSON'),
+    ], required=True, default='csv')
+    layout_file = fields.Binary(string='Layout File', required=True)
+    filename = fields.Char()
+
+    def action_import(self):
+        self.ensure_one()
+        booths = self.event_id._import_food_booths(base64.b64decode(self.layout_file), self.file_format)
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Booth Import'),
+                'message': _('%s booths imported.', len(booths)),
+                'next': {'type': 'ir.actions.act_window_close'},
+            },
+        }
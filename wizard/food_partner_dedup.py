@@ -0,0 +1,62 @@
+"""
+Merge the vendor partners duplicated by earlier seasons.
+
+The wizard previews how many duplicate groups exist and merges them,
+a limited number of groups per run, through
+``res.partner._food_merge_duplicates``.
+"""
+
+from odoo import _, api, fields, models
+
+
+class FoodPartnerDedup(models.TransientModel):
+    _name = 'food.partner.dedup'
+    _description = 'Merge Duplicate Vendor Partners'
+
+    group_count = fields.Integer(string='Duplicate Groups', readonly=True)
+    duplicate_count = fields.Integer(string='Partners to Merge', readonly=True)
+    group_limit = fields.Integer(string='Groups per Run', default=500, required=True)
+
+    @api.model
+    def default_get(self, fields_list):
+        res = super().default_get(fields_list)
+        groups = self.env['res.partner']._food_duplicate_groups()
+        res.update({
+            'group_count': len(groups),
+            'duplicate_count': sum(len(ids) - 1 for ids in groups),
+        })
+        return res
+
+    def action_merge(self):
+        self.ensure_one()
+        merged, refused = self.env['res.partner']._food_merge_duplicates(limit=self.group_limit or None)
+        if not refused:
+            return {
+                'type': 'ir.actions.client',
+                'tag': 'display_notification',
+                'params': {
+                    'title': _('Duplicate Vendors'),
+                    'message': _('%s duplicate partners merged.', merged),
+                    'next': {'type': 'ir.actions.act_window_close'},
+                },
+            }
+        # the merge refused some groups: list them for a manual review
+        return {
+            'type': 'ir.actions.client',
+            'tag': 'display_notification',
+            'params': {
+                'title': _('Duplicate Vendors'),
+                'message': _(
+                    '%(merged)s duplicate partners merged, %(refused)s groups need a manual merge.',
+                    merged=merged, refused=len(refused),
+                ),
+                'type': 'warning',
+                'next': {
+                    'type': 'ir.actions.act_window',
+                    'name': _('Duplicates to Review'),
+                    'res_model': 'res.partner',
+                    'views': [(False, 'list'), (False, 'form')],
+                    'domain': [('id', 'in', [partner_id for ids in refused for partner_id in ids])],
+                },
+            },
+        }